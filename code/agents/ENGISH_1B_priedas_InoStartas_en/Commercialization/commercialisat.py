@@ -1,19 +1,35 @@
 import openpyxl
+import io
 import json
 import os
 import logging
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, asdict
+import numpy as np
 from dotenv import load_dotenv
 from groq import Groq
 
-# Load environment variables
-load_dotenv()
-
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Groq clients keep an HTTP connection pool, so one client per API key is shared across runs
+_GROQ_CLIENTS: Dict[str, Groq] = {}
+
+def _get_groq_client(api_key: str) -> Groq:
+    """Return the shared Groq client for an API key, creating it on first use"""
+    client = _GROQ_CLIENTS.get(api_key)
+    if client is None:
+        client = _GROQ_CLIENTS[api_key] = Groq(api_key=api_key)
+    return client
+
+@lru_cache(maxsize=4)
+def _load_prompt(prompt_path: str) -> str:
+    """Read a prompt file once; prompts are shipped with the repo and do not change at runtime"""
+    return Path(prompt_path).read_bytes().decode('utf-8')
+
 @dataclass
 class MarketDevelopmentEntry:
     """Data class for market development service entries"""
@@ -26,32 +42,36 @@ class MarketDevelopmentEntry:
 @dataclass
 class MarketDevelopmentData:
     """Complete market development service data structure"""
-    table1_entries: List[MarketDevelopmentEntry]  # Type 1 expenditure (3 entries)
-    table2_entries: List[MarketDevelopmentEntry]  # Type 2 expenditure (3 entries)
-    table3_entries: List[MarketDevelopmentEntry]  # Type 3 expenditure (3 entries)
-    table4_entries: List[MarketDevelopmentEntry]  # Type 4 expenditure (3 entries)
-    table5_entries: List[MarketDevelopmentEntry]  # Type 5 expenditure (3 entries)
+    tables: List[List[MarketDevelopmentEntry]]  # 5 expenditure types (3 entries each)
+    prices: np.ndarray = field(init=False, repr=False)  # (5, 3) prices, NaN where an entry is missing
+    counts: np.ndarray = field(init=False, repr=False)  # Number of entries per table
     
     def __post_init__(self):
-        # Ensure exactly 3 entries per table
-        self.table1_entries = self.table1_entries[:3]
-        self.table2_entries = self.table2_entries[:3]
-        self.table3_entries = self.table3_entries[:3]
-        self.table4_entries = self.table4_entries[:3]
-        self.table5_entries = self.table5_entries[:3]
+        # Ensure exactly 5 tables with at most 3 entries each
+        tables = [entries[:3] for entries in self.tables[:5]]
+        tables.extend([] for _ in range(5 - len(tables)))
+        self.tables = tables
+        
+        self.prices = np.full((5, 3), np.nan)
+        for i, entries in enumerate(tables):
+            self.prices[i, :len(entries)] = [entry.price_eur for entry in entries]
+        self.counts = np.array([len(entries) for entries in tables])
+    
+    @property
+    def subtotals(self) -> np.ndarray:
+        """Lowest price per table (0 for tables without entries)"""
+        return np.where(self.counts > 0, np.fmin.reduce(self.prices, axis=1), 0.0)
 
 class GroqMarketAnalyzer:
     """Analyzes market development data using Groq LLM"""
     
     def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
+        self.client = _get_groq_client(api_key)
 
     def create_analysis_prompt(self, prompt_path: str = "code/prompts/commercialist.txt") -> str:
         """Read detailed prompt for market development service extraction from a file"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as file:
-                prompt = file.read()
-            return prompt
+            return _load_prompt(prompt_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found at: {prompt_path}")
         except Exception as e:
@@ -65,27 +85,21 @@ class GroqMarketAnalyzer:
         prompt = self.create_analysis_prompt()
         
         try:
-            completion = self.client.chat.completions.create(
-                model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert market development analyst specializing in extracting structured information from product market readiness documents and service proposals."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{prompt}\n\nText to analyze:\n{text_content}"
-                    }
-                ],
-                temperature=0.3
-            )
-            
-            analysis_result = completion.choices[0].message.content
+            analysis_result = self._request_analysis(prompt, text_content)
             logger.info("Received analysis from Groq API")
             
             # Clean and parse JSON
             json_content = self._extract_json_from_response(analysis_result)
-            parsed_data = json.loads(json_content)
+            try:
+                parsed_data = json.loads(json_content)
+            except json.JSONDecodeError as e:
+                # Retry once in JSON mode so the model cannot return malformed output
+                logger.warning(f"Failed to parse JSON ({e}), retrying in JSON mode")
+                analysis_result = self._request_analysis(
+                    prompt, text_content, response_format={"type": "json_object"}
+                )
+                json_content = self._extract_json_from_response(analysis_result)
+                parsed_data = json.loads(json_content)
             
             # Convert to MarketDevelopmentData object
             market_data = self._convert_to_market_data(parsed_data)
@@ -100,6 +114,29 @@ class GroqMarketAnalyzer:
             logger.error(f"Analysis failed: {e}")
             raise
     
+    def _request_analysis(self, prompt: str, text_content: str, **request_options) -> str:
+        """Send the analysis request to Groq and return the raw response text"""
+        
+        # temperature=0 with a fixed seed keeps responses deterministic for the same input
+        completion = self.client.chat.completions.create(
+            model="meta-llama/llama-4-scout-17b-16e-instruct",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert market development analyst specializing in extracting structured information from product market readiness documents and service proposals."
+                },
+                {
+                    "role": "user",
+                    "content": f"{prompt}\n\nText to analyze:\n{text_content}"
+                }
+            ],
+            temperature=0,
+            seed=42,
+            **request_options
+        )
+        
+        return completion.choices[0].message.content
+    
     def _extract_json_from_response(self, response: str) -> str:
         """Extract JSON from response, handling markdown code blocks"""
         
@@ -137,20 +174,24 @@ class GroqMarketAnalyzer:
                 entries.append(entry)
             return entries
         
-        market_data = MarketDevelopmentData(
-            table1_entries=create_entries(parsed_data.get('table1_entries', []), 1),
-            table2_entries=create_entries(parsed_data.get('table2_entries', []), 2),
-            table3_entries=create_entries(parsed_data.get('table3_entries', []), 3),
-            table4_entries=create_entries(parsed_data.get('table4_entries', []), 4),
-            table5_entries=create_entries(parsed_data.get('table5_entries', []), 5)
-        )
+        market_data = MarketDevelopmentData(tables=[
+            create_entries(parsed_data.get(f'table{table_num}_entries', []), table_num)
+            for table_num in range(1, 6)
+        ])
         
         return market_data
 
 class MarketDevelopmentExcelFiller:
     """Fills Excel form with market development service data"""
     
-    def __init__(self):
+    def __init__(self, template_path: Optional[str] = None):
+        # Template bytes and sheet name are resolved once per template instead of on every fill
+        self._template_path = None
+        self._template_bytes = None
+        self._sheet_name = None
+        if template_path:
+            self._load_template(template_path)
+        
         self.table_mappings = {
             1: {
                 'rows': [7, 8, 9],
@@ -188,89 +229,100 @@ class MarketDevelopmentExcelFiller:
         """Fill Excel form with market development service data"""
         
         try:
-            logger.info(f"Loading Excel template: {template_path}")
-            workbook = openpyxl.load_workbook(template_path)
-            
-            # Get the correct sheet - looking for market development sheet
-            sheet_name = None
-            for name in workbook.sheetnames:
-                if 'market' in name.lower() or 'commercialization' in name.lower() or 'development' in name.lower():
-                    sheet_name = name
-                    break
-            
-            if not sheet_name:
-                sheet_name = workbook.sheetnames[0]  # Use first sheet as fallback
-                logger.warning(f"Market development sheet not found, using: {sheet_name}")
-            
-            sheet = workbook[sheet_name]
-            
-            # Fill all 5 tables
-            self._fill_table(sheet, market_data.table1_entries, 1)
-            self._fill_table(sheet, market_data.table2_entries, 2)
-            self._fill_table(sheet, market_data.table3_entries, 3)
-            self._fill_table(sheet, market_data.table4_entries, 4)
-            self._fill_table(sheet, market_data.table5_entries, 5)
+            if template_path != self._template_path:
+                self._load_template(template_path)
             
-            # Calculate and fill totals
-            self._calculate_totals(sheet)
+            filled_bytes = self.fill_excel_form_bytes(self._template_bytes, market_data)
             
             # Save the filled workbook
-            workbook.save(output_path)
+            Path(output_path).write_bytes(filled_bytes)
             logger.info(f"✅ Successfully saved Excel form: {output_path}")
             
             return True
             
-        except Exception as e:
-            logger.error(f"❌ Failed to fill Excel form: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Failed to fill Excel form")
             return False
     
-    def _fill_table(self, sheet, entries: List[MarketDevelopmentEntry], table_number: int):
+    def fill_excel_form_bytes(self, template_bytes: bytes, market_data: MarketDevelopmentData) -> bytes:
+        """Fill an in-memory Excel template and return the filled workbook as bytes"""
+        
+        workbook = openpyxl.load_workbook(io.BytesIO(template_bytes))
+        
+        # Get the correct sheet - resolved at init when the template is known
+        sheet_name = self._sheet_name
+        if sheet_name not in workbook.sheetnames:
+            sheet_name = self._find_sheet_name(workbook.sheetnames)
+        
+        sheet = workbook[sheet_name]
+        
+        # Fill all 5 tables
+        subtotals = market_data.subtotals
+        for table_number, entries in enumerate(market_data.tables, start=1):
+            self._fill_table(sheet, entries, table_number, float(subtotals[table_number - 1]))
+        
+        # Calculate and fill totals
+        self._calculate_totals(sheet, subtotals)
+        
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
+    
+    def _load_template(self, template_path: str):
+        """Read the template into memory and resolve its sheet name"""
+        
+        logger.info(f"Loading Excel template: {template_path}")
+        template_bytes = Path(template_path).read_bytes()
+        
+        workbook = openpyxl.load_workbook(io.BytesIO(template_bytes), read_only=True)
+        sheet_name = self._find_sheet_name(workbook.sheetnames)
+        workbook.close()
+        
+        self._template_path = template_path
+        self._template_bytes = template_bytes
+        self._sheet_name = sheet_name
+    
+    @staticmethod
+    def _find_sheet_name(sheetnames: List[str]) -> str:
+        """Find the market development sheet, falling back to the first sheet"""
+        
+        for name in sheetnames:
+            lowered = name.lower()
+            if 'market' in lowered or 'commercialization' in lowered or 'development' in lowered:
+                return name
+        
+        logger.warning(f"Market development sheet not found, using: {sheetnames[0]}")
+        return sheetnames[0]  # Use first sheet as fallback
+    
+    def _fill_table(self, sheet, entries: List[MarketDevelopmentEntry], table_number: int, subtotal: float):
         """Fill a specific table with market development entries"""
         
         mapping = self.table_mappings[table_number]
         rows = mapping['rows']
-        subtotal = 0.0
         
-        # Use the lowest price among the 3 commercial offers (as per requirements)
-        if entries:
-            prices = [entry.price_eur for entry in entries]
-            lowest_price = min(prices)
-            
-            # Fill all entries but use lowest price for calculation
-            for i, entry in enumerate(entries):
-                if i < len(rows):
-                    row = rows[i]
-                    
-                    # Fill supplier info (Columns B:C merged)
-                    sheet[f"B{row}"] = entry.supplier_info
-                    
-                    # Fill price (Column D)
-                    sheet[f"D{row}"] = entry.price_eur
-                    
-                    logger.info(f"✅ Table {table_number}, Row {row}: {entry.expenditure_type} - €{entry.price_eur}")
-            
-            # Fixed subtotal uses lowest price (as per requirements)
-            subtotal = lowest_price
+        # Fill all entries; the subtotal is the lowest price among the 3 commercial offers (as per requirements)
+        for i, entry in enumerate(entries):
+            if i < len(rows):
+                row = rows[i]
+                
+                # Fill supplier info (Columns B:C merged)
+                sheet[f"B{row}"] = entry.supplier_info
+                
+                # Fill price (Column D)
+                sheet[f"D{row}"] = entry.price_eur
+                
+                logger.info(f"✅ Table {table_number}, Row {row}: {entry.expenditure_type} - €{entry.price_eur}")
         
         # Fill subtotal
         sheet[mapping['subtotal_cell']] = subtotal
         logger.info(f"✅ Table {table_number} Fixed Subtotal (lowest price): €{subtotal}")
     
-    def _calculate_totals(self, sheet):
+    def _calculate_totals(self, sheet, subtotals: np.ndarray):
         """Calculate and fill all totals in the Excel sheet"""
         
         try:
-            # Get subtotals from each table
-            table1_subtotal = float(sheet['D10'].value or 0)
-            table2_subtotal = float(sheet['D16'].value or 0)
-            table3_subtotal = float(sheet['D22'].value or 0)
-            table4_subtotal = float(sheet['D28'].value or 0)
-            table5_subtotal = float(sheet['D34'].value or 0)
-            
             # Calculate Fixed Amount (D36) - sum of all subtotals
-            fixed_amount = table1_subtotal + table2_subtotal + table3_subtotal + table4_subtotal + table5_subtotal
+            fixed_amount = float(subtotals.sum())
             sheet['D36'] = fixed_amount
             
             # Calculate Indirect costs (D37) - typically 7% of fixed amount
@@ -286,11 +338,8 @@ class MarketDevelopmentExcelFiller:
             sheet['D39'] = funding_requested
             
             logger.info(f"✅ Calculated totals:")
-            logger.info(f"   Table 1 Subtotal: €{table1_subtotal:,.2f}")
-            logger.info(f"   Table 2 Subtotal: €{table2_subtotal:,.2f}")
-            logger.info(f"   Table 3 Subtotal: €{table3_subtotal:,.2f}")
-            logger.info(f"   Table 4 Subtotal: €{table4_subtotal:,.2f}")
-            logger.info(f"   Table 5 Subtotal: €{table5_subtotal:,.2f}")
+            for table_number, subtotal in enumerate(subtotals, start=1):
+                logger.info(f"   Table {table_number} Subtotal: €{subtotal:,.2f}")
             logger.info(f"   Fixed Amount: €{fixed_amount:,.2f}")
             logger.info(f"   Indirect costs (7%): €{indirect_costs:,.2f}")
             logger.info(f"   Total costs: €{total_costs:,.2f}")
@@ -302,9 +351,9 @@ class MarketDevelopmentExcelFiller:
 class MarketDevelopmentAgent:
     """Main orchestrator for market development processing"""
     
-    def __init__(self, groq_api_key: str):
+    def __init__(self, groq_api_key: str, template_path: Optional[str] = None):
         self.analyzer = GroqMarketAnalyzer(groq_api_key)
-        self.excel_filler = MarketDevelopmentExcelFiller()
+        self.excel_filler = MarketDevelopmentExcelFiller(template_path)
     
     def read_data_file(self, file_path: str) -> str:
         """Read content from data file"""
@@ -370,37 +419,39 @@ class MarketDevelopmentAgent:
     def _generate_statistics(self, market_data: MarketDevelopmentData) -> Dict[str, Any]:
         """Generate comprehensive statistics"""
         
-        def get_table_stats(entries: List[MarketDevelopmentEntry], table_name: str):
-            if not entries:
-                return {'total': 0.0, 'lowest': 0.0, 'highest': 0.0, 'average': 0.0, 'count': 0}
-            
-            prices = [entry.price_eur for entry in entries]
-            return {
-                'total': sum(prices),
-                'lowest': min(prices),
-                'highest': max(prices),
-                'average': sum(prices) / len(prices),
-                'count': len(entries)
-            }
+        prices = market_data.prices
+        counts = market_data.counts
+        has_entries = counts > 0
         
-        table1_stats = get_table_stats(market_data.table1_entries, "Market Research & Analysis")
-        table2_stats = get_table_stats(market_data.table2_entries, "Marketing Strategy Development")
-        table3_stats = get_table_stats(market_data.table3_entries, "Brand Development & Positioning")
-        table4_stats = get_table_stats(market_data.table4_entries, "Market Testing & Validation")
-        table5_stats = get_table_stats(market_data.table5_entries, "Market Entry & Launch Support")
+        # Per-table stats for all 5 tables at once; missing entries are NaN and ignored
+        lowest = market_data.subtotals
+        highest = np.where(has_entries, np.fmax.reduce(prices, axis=1), 0.0)
+        totals = np.nansum(prices, axis=1)
+        averages = np.divide(totals, counts, out=np.zeros(len(counts)), where=has_entries)
+        
+        table_keys = [
+            'table1_market_research',    # Market Research & Analysis
+            'table2_marketing_strategy', # Marketing Strategy Development
+            'table3_brand_development',  # Brand Development & Positioning
+            'table4_market_testing',     # Market Testing & Validation
+            'table5_market_entry'        # Market Entry & Launch Support
+        ]
+        table_breakdown = {
+            key: {
+                'total': float(totals[i]),
+                'lowest': float(lowest[i]),
+                'highest': float(highest[i]),
+                'average': float(averages[i]),
+                'count': int(counts[i])
+            }
+            for i, key in enumerate(table_keys)
+        }
         
         # Calculate totals using lowest prices (as per form requirements)
-        fixed_amount = (table1_stats['lowest'] + table2_stats['lowest'] + 
-                       table3_stats['lowest'] + table4_stats['lowest'] + table5_stats['lowest'])
+        fixed_amount = float(lowest.sum())
         
         statistics = {
-            'table_breakdown': {
-                'table1_market_research': table1_stats,
-                'table2_marketing_strategy': table2_stats,
-                'table3_brand_development': table3_stats,
-                'table4_market_testing': table4_stats,
-                'table5_market_entry': table5_stats
-            },
+            'table_breakdown': table_breakdown,
             'cost_summary': {
                 'fixed_amount': fixed_amount,
                 'indirect_costs': fixed_amount * 0.07,
@@ -466,6 +517,9 @@ def main_commercilisat(data_file_path):
     
     print("🚀 MARKET DEVELOPMENT EXCEL FORM FILLER")
     print("="*50)
+    # Load environment variables
+    load_dotenv()
+    
     # Configuration
     GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
     if not GROQ_API_KEY:
@@ -491,7 +545,7 @@ def main_commercilisat(data_file_path):
     try:
         # Initialize agent
         print(f"\n🔧 Initializing Market Development Agent...")
-        agent = MarketDevelopmentAgent(GROQ_API_KEY)
+        agent = MarketDevelopmentAgent(GROQ_API_KEY, template_path)
         
         # Process market development services
         print(f"\n🔄 Processing market development services from {data_file_path}...")
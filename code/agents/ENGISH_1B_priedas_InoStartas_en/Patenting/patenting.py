@@ -1,11 +1,27 @@
 import openpyxl
+import asyncio
+import hashlib
+import io
 import json
+import math
 import os
 import logging
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import httpx
+import orjson
+import re
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field, asdict
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, DefaultAsyncHttpxClient, DefaultHttpxClient, Groq
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils.cell import column_index_from_string, coordinate_to_tuple, get_column_letter
 
 # Load environment variables
 load_dotenv()
@@ -14,7 +30,29 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Markdown code fence around the JSON payload, with or without a "json" language tag
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+# XLSX package namespaces used to locate a worksheet part without loading the workbook
+_XLSX_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# Groq models: a small, fast model for routine extraction and a larger one to retry responses that fail validation
+FAST_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+DEFAULT_TEMPERATURE = 0.0
+
+# Keep-alive pool shared by all requests of a client, so warm calls skip the TCP/TLS handshake
+_GROQ_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+@lru_cache(maxsize=4)
+def _load_prompt(prompt_path: str) -> str:
+    """Read a prompt file once per path and keep it for later analyses"""
+    with open(prompt_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+@dataclass(slots=True)
 class PatentServiceEntry:
     """Data class for patent service entries"""
     description: str
@@ -22,13 +60,18 @@ class PatentServiceEntry:
     price_eur: float
     category: str  # 'phase1_attorney', 'phase1_taxes', 'phase2_attorney', 'phase2_taxes'
 
-@dataclass
+@dataclass(slots=True)
 class PatentData:
     """Complete patent service data structure"""
     phase1_attorney_services: List[PatentServiceEntry]
     phase1_taxes: List[PatentServiceEntry]
     phase2_attorney_services: List[PatentServiceEntry]
     phase2_taxes: List[PatentServiceEntry]
+    # Section subtotals, computed once and shared by the Excel filler and the statistics
+    phase1_attorney_total: float = field(init=False)
+    phase1_taxes_total: float = field(init=False)
+    phase2_attorney_total: float = field(init=False)
+    phase2_taxes_total: float = field(init=False)
     
     def __post_init__(self):
         # Ensure we have exactly the right number of entries for each category
@@ -36,19 +79,79 @@ class PatentData:
         self.phase1_taxes = self.phase1_taxes[:3]  # Max 3 entries
         self.phase2_attorney_services = self.phase2_attorney_services[:3]  # Max 3 entries
         self.phase2_taxes = self.phase2_taxes[:4]  # Max 4 entries
+        
+        self.phase1_attorney_total = math.fsum([s.price_eur for s in self.phase1_attorney_services])
+        self.phase1_taxes_total = math.fsum([s.price_eur for s in self.phase1_taxes])
+        self.phase2_attorney_total = math.fsum([s.price_eur for s in self.phase2_attorney_services])
+        self.phase2_taxes_total = math.fsum([s.price_eur for s in self.phase2_taxes])
 
 class GroqPatentAnalyzer:
     """Analyzes patent service data using Groq LLM"""
     
-    def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key: str, cache_path: Optional[str] = None, model: str = FAST_MODEL,
+                 temperature: float = DEFAULT_TEMPERATURE, large_model: Optional[str] = LARGE_MODEL):
+        self.api_key = api_key
+        self.model = model
+        self.temperature = temperature
+        self.large_model = large_model
+        self.client = Groq(api_key=api_key, http_client=DefaultHttpxClient(limits=_GROQ_HTTP_LIMITS))
+        self._prompt_prefix = None
+        
+        # Exact-match response cache: request hash -> cleaned JSON, optionally persisted to cache_path
+        self.cache_path = cache_path
+        self._cache: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()  # Batch runs may store results from several threads
+        if cache_path:
+            self._cache = self._load_cache(cache_path)
+        
+    @staticmethod
+    def _load_cache(cache_path: str) -> Dict[str, str]:
+        """Read the persisted response cache, treating a missing or unreadable file as empty"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Groq cache {cache_path}: {e}")
+            return {}
+        if not isinstance(cache, dict):
+            logger.warning(f"Ignoring malformed Groq cache {cache_path}")
+            return {}
+        return cache
+    
+    def _save_cache(self):
+        """Atomically rewrite the persisted response cache; callers hold _cache_lock"""
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.cache_path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(self._cache, file)
+            os.replace(temp_path, self.cache_path)
+            temp_path = None
+        except OSError as e:
+            logger.warning(f"Could not write Groq cache {self.cache_path}: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+        
+    def close(self):
+        """Close the Groq client's connection pool"""
+        self.client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
     def create_analysis_prompt(self, prompt_path: str = "code/prompts/patenting.txt") -> str:
         """Read detailed prompt for market development service extraction from a file"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as file:
-                prompt = file.read()
-            return prompt
+            return _load_prompt(prompt_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found at: {prompt_path}")
         except Exception as e:
@@ -59,64 +162,132 @@ class GroqPatentAnalyzer:
         
         logger.info("Starting patent service data analysis...")
         
-        prompt = self.create_analysis_prompt()
+        try:
+            return self._analyze_with_model(text_content, self.model)
+        except (ValueError, TypeError, AttributeError) as e:
+            if not self._should_retry_with_large_model(e):
+                raise
+            return self._analyze_with_model(text_content, self.large_model)
+    
+    async def analyze_patent_data_async(self, text_content: str, client: AsyncGroq) -> PatentData:
+        """Analyze text with an async Groq client so several documents can be analyzed concurrently"""
+        
+        logger.info("Starting patent service data analysis...")
         
         try:
-            completion = self.client.chat.completions.create(
-                model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert patent service data analyst specializing in extracting structured information from patent-related documents and invoices."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{prompt}\n\nText to analyze:\n{text_content}"
-                    }
-                ],
-                temperature=0.3
-            )
+            return await self._analyze_with_model_async(text_content, self.model, client)
+        except (ValueError, TypeError, AttributeError) as e:
+            if not self._should_retry_with_large_model(e):
+                raise
+            return await self._analyze_with_model_async(text_content, self.large_model, client)
+    
+    def _should_retry_with_large_model(self, error: Exception) -> bool:
+        """Whether a response that failed parsing/validation should be retried with the large model"""
+        
+        if not self.large_model or self.large_model == self.model:
+            return False
+        logger.warning(f"{self.model} response failed validation ({error}), retrying with {self.large_model}")
+        return True
+    
+    def _analyze_with_model(self, text_content: str, model: str) -> PatentData:
+        """Run one analysis with the given model, using the response cache"""
+        
+        request = self._build_request(text_content, model)
+        cache_key = self._cache_key(request)
+        if cache_key in self._cache:
+            logger.info("Using cached analysis")
+            return self._parse_analysis(self._cache[cache_key])
+        
+        try:
+            completion = self.client.chat.completions.create(**request)
             
             analysis_result = completion.choices[0].message.content
             logger.info("Received analysis from Groq API")
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}")
+            raise
+        
+        return self._parse_analysis(analysis_result, cache_key)
+    
+    async def _analyze_with_model_async(self, text_content: str, model: str, client: AsyncGroq) -> PatentData:
+        """Async counterpart of _analyze_with_model"""
+        
+        request = self._build_request(text_content, model)
+        cache_key = self._cache_key(request)
+        if cache_key in self._cache:
+            logger.info("Using cached analysis")
+            return self._parse_analysis(self._cache[cache_key])
+        
+        try:
+            completion = await client.chat.completions.create(**request)
             
+            analysis_result = completion.choices[0].message.content
+            logger.info("Received analysis from Groq API")
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}")
+            raise
+        
+        return self._parse_analysis(analysis_result, cache_key)
+    
+    def _build_request(self, text_content: str, model: str) -> Dict[str, Any]:
+        """Build the chat completion arguments for a document"""
+        
+        # The prompt part of the user message is the same for every document
+        if self._prompt_prefix is None:
+            self._prompt_prefix = f"{self.create_analysis_prompt()}\n\nText to analyze:\n"
+        
+        return {
+            'model': model,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "You are an expert patent service data analyst specializing in extracting structured information from patent-related documents and invoices. Return ONLY a JSON object matching the schema."
+                },
+                {
+                    "role": "user",
+                    "content": self._prompt_prefix + text_content
+                }
+            ],
+            'temperature': self.temperature,
+            # JSON mode drops markdown fences and chatter; 13 entries fit well within the token cap
+            'response_format': {"type": "json_object"},
+            'max_tokens': 1024
+        }
+    
+    def _cache_key(self, request: Dict[str, Any]) -> str:
+        """Hash the prompt, document text and model into a cache key"""
+        
+        user_content = request['messages'][-1]['content']
+        return hashlib.sha256(f"{user_content}||{request['model']}".encode('utf-8')).hexdigest()
+    
+    def _parse_analysis(self, analysis_result: str, cache_key: Optional[str] = None) -> PatentData:
+        """Parse the raw Groq response into a PatentData object, caching it under cache_key"""
+        
+        try:
             # Clean and parse JSON
             json_content = self._extract_json_from_response(analysis_result)
-            parsed_data = json.loads(json_content)
-            
-            # Convert to PatentData object
-            patent_data = self._convert_to_patent_data(parsed_data)
-            
-            return patent_data
-            
-        except json.JSONDecodeError as e:
+            parsed_data = orjson.loads(json_content)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
             logger.error(f"Failed to parse JSON: {e}")
             logger.error(f"Raw response: {analysis_result}")
             raise
-        except Exception as e:
-            logger.error(f"Analysis failed: {e}")
-            raise
-    
-    def _extract_json_from_response(self, response: str) -> str:
-        """Extract JSON from response, handling markdown code blocks"""
         
-        response = response.strip()
+        # Convert to PatentData object; only responses that convert cleanly are cached
+        patent_data = self._convert_to_patent_data(parsed_data)
         
-        # Remove markdown code blocks if present
-        if '```json' in response:
-            start_marker = '```json'
-            end_marker = '```'
-            start_index = response.find(start_marker)
-            if start_index != -1:
-                start_index += len(start_marker)
-                end_index = response.find(end_marker, start_index)
-                if end_index != -1:
-                    return response[start_index:end_index].strip()
+        if cache_key is not None:
+            with self._cache_lock:
+                self._cache[cache_key] = json_content
+                if self.cache_path:
+                    self._save_cache()
         
-        if response.startswith('```') and response.endswith('```'):
-            return response[3:-3].strip()
+        return patent_data
+    
+    def _extract_json_from_response(self, response: str) -> str:
+        """Extract JSON from response, handling markdown code blocks"""
         
-        return response
+        match = _FENCE_RE.search(response)
+        return (match.group(1) if match else response).strip()
     
     def _convert_to_patent_data(self, parsed_data: Dict) -> PatentData:
         """Convert parsed JSON to PatentData object"""
@@ -150,10 +321,41 @@ class GroqPatentAnalyzer:
         
         return patent_data
 
+def _escape_cell_text(value: str) -> str:
+    """XML-escape cell text; control characters XML cannot hold use the OOXML _xHHHH_ escape"""
+    return ILLEGAL_CHARACTERS_RE.sub(lambda match: "_x%04X_" % ord(match.group(0)), escape(value))
+
+class _CellRecorder:
+    """Stand-in worksheet that records sheet.cell(...) writes for XML patching"""
+    
+    def __init__(self):
+        self.values: Dict[Tuple[int, int], Any] = {}
+    
+    def cell(self, row: int, column: int, value: Any = None):
+        # Like openpyxl, a None value leaves the template cell as it is
+        if value is not None:
+            self.values[(row, column)] = value
+
+@dataclass(slots=True)
+class _LoadedTemplate:
+    """Bytes of one template file plus its patent sheet name and worksheet part, resolved on first use"""
+    data: bytes
+    sheet_name: Optional[str] = None
+    sheet_path: Optional[str] = None
+
 class PatentExcelFiller:
     """Fills Excel form with patent service data"""
     
+    # Integer column index of the totals column, so cells are addressed without parsing "D17"-style coordinates
+    PRICE_COLUMN = 4  # Column D
+    
     def __init__(self):
+        # Raw template bytes per template path, read once and re-parsed from memory on each fill.
+        # Batch runs fill from several threads, so each fill works on its own _LoadedTemplate entry
+        # and the dict is only touched under the lock.
+        self._templates: Dict[str, _LoadedTemplate] = {}
+        self._templates_lock = threading.Lock()
+        
         self.cell_mappings = {
             # Phase I Attorney Services (rows 7-9)
             'phase1_attorney': {
@@ -188,137 +390,298 @@ class PatentExcelFiller:
                 'subtotal_cell': 'D32'
             }
         }
+        
+        # Integer layout of each section, parsed once:
+        # (rows, supplier column, price column, subtotal row, subtotal column)
+        self._sections = {}
+        for section, mapping in self.cell_mappings.items():
+            subtotal_row, subtotal_column = coordinate_to_tuple(mapping['subtotal_cell'])
+            self._sections[section] = (
+                tuple(mapping['rows']),
+                column_index_from_string(mapping['supplier_cols'].split(':')[0]),
+                column_index_from_string(mapping['price_col']),
+                subtotal_row,
+                subtotal_column
+            )
     
     def fill_excel_form(self, template_path: str, output_path: str, patent_data: PatentData) -> bool:
         """Fill Excel form with patent service data"""
         
         try:
-            logger.info(f"Loading Excel template: {template_path}")
-            workbook = openpyxl.load_workbook(template_path)
+            template = self._load_template(template_path)
+            
+            # The template's styling must survive, so it is patched in place rather than rebuilt
+            # with a write-only workbook; openpyxl uses lxml (see requirements.txt) when installed
+            # External links and rich text are never used by this form, so skip parsing them
+            workbook = openpyxl.load_workbook(
+                io.BytesIO(template.data), read_only=False, keep_vba=False, data_only=False,
+                keep_links=False, rich_text=False
+            )
             
             # Get the correct sheet - looking for patenting sheet
-            sheet_name = None
-            for name in workbook.sheetnames:
-                if 'patent' in name.lower() or 'fictitious' in name.lower():
-                    sheet_name = name
-                    break
-            
-            if not sheet_name:
-                sheet_name = workbook.sheetnames[0]  # Use first sheet as fallback
-                logger.warning(f"Patent sheet not found, using: {sheet_name}")
-            
-            sheet = workbook[sheet_name]
-            
-            # Fill Phase I Attorney Services
-            self._fill_service_section(
-                sheet, 
-                patent_data.phase1_attorney_services, 
-                self.cell_mappings['phase1_attorney']
-            )
+            sheet = workbook[self._resolve_sheet_name(template, workbook.sheetnames)]
             
-            # Fill Phase I Taxes
-            self._fill_service_section(
-                sheet, 
-                patent_data.phase1_taxes, 
-                self.cell_mappings['phase1_taxes']
-            )
+            self._fill_sheet(sheet, patent_data)
             
-            # Fill Phase II Attorney Services
-            self._fill_service_section(
-                sheet, 
-                patent_data.phase2_attorney_services, 
-                self.cell_mappings['phase2_attorney']
-            )
+            # Save the filled workbook
+            buffer = io.BytesIO()
+            workbook.save(buffer)
+            self._write_output(output_path, buffer)
+            logger.info(f"✅ Successfully saved Excel form: {output_path}")
             
-            # Fill Phase II Taxes
-            self._fill_service_section(
-                sheet, 
-                patent_data.phase2_taxes, 
-                self.cell_mappings['phase2_taxes']
-            )
+            return True
             
-            # Calculate and fill totals
-            self._calculate_totals(sheet)
+        except Exception as e:
+            logger.exception("❌ Failed to fill Excel form: %s", e)
+            return False
+    
+    def fill_excel_form_fast(self, template_path: str, output_path: str, patent_data: PatentData) -> bool:
+        """Fill Excel form by patching the worksheet XML inside the template zip
+        
+        Only the target <c> elements of the patent sheet are rewritten; styles, themes and the
+        other package parts are copied through untouched. Falls back to fill_excel_form when a
+        target cell is missing from the template XML.
+        """
+        
+        try:
+            template = self._load_template(template_path)
             
-            # Save the filled workbook
-            workbook.save(output_path)
+            recorder = _CellRecorder()
+            self._fill_sheet(recorder, patent_data)
+            
+            buffer = self._patch_template(template, recorder.values)
+            if buffer is None:
+                logger.warning("Template cells not found for XML patching, falling back to openpyxl")
+                return self.fill_excel_form(template_path, output_path, patent_data)
+            
+            self._write_output(output_path, buffer)
             logger.info(f"✅ Successfully saved Excel form: {output_path}")
             
             return True
             
         except Exception as e:
-            logger.error(f"❌ Failed to fill Excel form: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Failed to fill Excel form: %s", e)
             return False
     
-    def _fill_service_section(self, sheet, services: List[PatentServiceEntry], mapping: Dict):
+    def _load_template(self, template_path: str) -> _LoadedTemplate:
+        """Return the cached template for this path, reading the file on first use"""
+        
+        with self._templates_lock:
+            template = self._templates.get(template_path)
+            if template is None:
+                logger.info(f"Loading Excel template: {template_path}")
+                with open(template_path, 'rb') as file:
+                    template = _LoadedTemplate(file.read())
+                self._templates[template_path] = template
+        return template
+    
+    def _resolve_sheet_name(self, template: _LoadedTemplate, sheetnames: List[str]) -> str:
+        """Return the patent sheet name of the template, scanning sheetnames only once"""
+        
+        # Concurrent first fills may both resolve it; they store the same name
+        if template.sheet_name is None:
+            template.sheet_name = self._find_sheet_name(sheetnames)
+        return template.sheet_name
+    
+    @staticmethod
+    def _find_sheet_name(sheetnames: List[str]) -> str:
+        """Find the patenting sheet, falling back to the first sheet"""
+        
+        sheet_name = next(
+            (name for name in sheetnames if 'patent' in name.lower() or 'fictitious' in name.lower()),
+            None
+        )
+        if sheet_name is None:
+            sheet_name = sheetnames[0]  # Use first sheet as fallback
+            logger.warning(f"Patent sheet not found, using: {sheet_name}")
+        return sheet_name
+    
+    def _fill_sheet(self, sheet, patent_data: PatentData):
+        """Write all sections and totals; sheet only needs a cell(row, column, value) method"""
+        
+        # Fill Phase I Attorney Services
+        self._fill_service_section(
+            sheet, 
+            patent_data.phase1_attorney_services, 
+            self._sections['phase1_attorney'],
+            patent_data.phase1_attorney_total
+        )
+        
+        # Fill Phase I Taxes
+        self._fill_service_section(
+            sheet, 
+            patent_data.phase1_taxes, 
+            self._sections['phase1_taxes'],
+            patent_data.phase1_taxes_total
+        )
+        
+        # Fill Phase II Attorney Services
+        self._fill_service_section(
+            sheet, 
+            patent_data.phase2_attorney_services, 
+            self._sections['phase2_attorney'],
+            patent_data.phase2_attorney_total
+        )
+        
+        # Fill Phase II Taxes
+        self._fill_service_section(
+            sheet, 
+            patent_data.phase2_taxes, 
+            self._sections['phase2_taxes'],
+            patent_data.phase2_taxes_total
+        )
+        
+        # Calculate and fill totals
+        self._calculate_totals(sheet, patent_data)
+    
+    def _patch_template(self, template_entry: _LoadedTemplate, values: Dict[Tuple[int, int], Any]) -> Optional[io.BytesIO]:
+        """Return a copy of the template zip with the given cell values, or None if a cell is missing"""
+        
+        with zipfile.ZipFile(io.BytesIO(template_entry.data)) as template:
+            if template_entry.sheet_path is None:
+                template_entry.sheet_path = self._sheet_xml_path(template_entry, template)
+            sheet_path = template_entry.sheet_path
+            sheet_xml = template.read(sheet_path).decode('utf-8')
+            
+            new_cells = {}
+            for (row, column), value in values.items():
+                if not isinstance(value, (str, int, float)):
+                    return None  # Dates and other types are left to openpyxl
+                reference = f"{get_column_letter(column)}{row}"
+                new_cells[reference] = value
+            
+            def replace_cell(match):
+                reference, attributes = match.group(1), match.group(2)
+                style = re.search(r'\ss="(\d+)"', attributes)
+                style_attribute = f' s="{style.group(1)}"' if style else ''
+                value = new_cells[reference]
+                # Same cell XML openpyxl writes for each value type
+                if value == "":
+                    return f'<c r="{reference}"{style_attribute}/>'
+                if isinstance(value, str):
+                    return (f'<c r="{reference}"{style_attribute} t="inlineStr">'
+                            f'<is><t xml:space="preserve">{_escape_cell_text(value)}</t></is></c>')
+                if isinstance(value, bool):
+                    return f'<c r="{reference}"{style_attribute} t="b"><v>{int(value)}</v></c>'
+                if math.isnan(value) or math.isinf(value):
+                    return f'<c r="{reference}"{style_attribute} t="n"/>'
+                return f'<c r="{reference}"{style_attribute} t="n"><v>{"%.16g" % value}</v></c>'
+            
+            cell_pattern = re.compile(
+                r'<c r="(%s)"([^>]*?)(?:/>|>.*?</c>)' % '|'.join(new_cells), re.S
+            )
+            patched_xml, replaced = cell_pattern.subn(replace_cell, sheet_xml)
+            if replaced != len(new_cells):
+                return None
+            
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as output:
+                for item in template.infolist():
+                    if item.filename == sheet_path:
+                        output.writestr(item, patched_xml.encode('utf-8'))
+                    else:
+                        output.writestr(item, template.read(item))
+        
+        return buffer
+    
+    def _sheet_xml_path(self, template_entry: _LoadedTemplate, template: zipfile.ZipFile) -> str:
+        """Locate the patent worksheet part through xl/workbook.xml and its relationships"""
+        
+        workbook_xml = ET.fromstring(template.read('xl/workbook.xml'))
+        sheets = {
+            sheet.get('name'): sheet.get(f'{{{_XLSX_REL_NS}}}id')
+            for sheet in workbook_xml.iter(f'{{{_XLSX_MAIN_NS}}}sheet')
+        }
+        relationship_id = sheets[self._resolve_sheet_name(template_entry, list(sheets))]
+        
+        rels_xml = ET.fromstring(template.read('xl/_rels/workbook.xml.rels'))
+        for relationship in rels_xml.iter(f'{{{_XLSX_PKG_REL_NS}}}Relationship'):
+            if relationship.get('Id') == relationship_id:
+                target = relationship.get('Target')
+                return target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+        
+        raise KeyError(f"Worksheet relationship not found: {relationship_id}")
+    
+    @staticmethod
+    def _write_output(output_path: str, buffer: io.BytesIO):
+        """Write the serialized workbook in one go and atomically replace output_path"""
+        
+        # A unique temp file in the target directory keeps concurrent writers apart and os.replace atomic
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(buffer.getbuffer())
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, output_path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _fill_service_section(self, sheet, services: List[PatentServiceEntry], section: Tuple, subtotal: float):
         """Fill a section of services in the Excel sheet"""
         
-        rows = mapping['rows']
-        subtotal = 0.0
+        rows, supplier_column, price_column, subtotal_row, subtotal_column = section
         
-        for i, service in enumerate(services):
-            if i < len(rows):
-                row = rows[i]
-                
-                # Fill description (Column A)
-                # sheet[f"A{row}"] = service.eil_no
-                
-                # Fill supplier info (Columns B:C merged)
-                sheet[f"B{row}"] = service.supplier_info
-                
-                # Fill price (Column D)
-                sheet[f"D{row}"] = service.price_eur
-                subtotal += service.price_eur
-                
-                logger.info(f"✅ Filled row {row}: {service.description} - €{service.price_eur}")
+        # zip stops at the last row of the section
+        for row, service in zip(rows, services):
+            # Fill description (Column A)
+            # sheet[f"A{row}"] = service.eil_no
+            
+            # Fill supplier info (Columns B:C merged)
+            sheet.cell(row=row, column=supplier_column, value=service.supplier_info)
+            
+            # Fill price (Column D)
+            sheet.cell(row=row, column=price_column, value=service.price_eur)
+            
+            logger.info("✅ Filled row %d: %s - €%s", row, service.description, service.price_eur)
         
         # Fill subtotal
-        sheet[mapping['subtotal_cell']] = subtotal
-        logger.info(f"✅ Subtotal for section: €{subtotal}")
+        sheet.cell(row=subtotal_row, column=subtotal_column, value=subtotal)
+        logger.info("✅ Subtotal for section: €%s", subtotal)
     
-    def _calculate_totals(self, sheet):
+    def _calculate_totals(self, sheet, patent_data: PatentData):
         """Calculate and fill all totals in the Excel sheet"""
         
         try:
-            # Get subtotals
-            phase1_attorney_subtotal = float(sheet['D10'].value or 0)
-            phase1_taxes_subtotal = float(sheet['D16'].value or 0)
-            phase2_attorney_subtotal = float(sheet['D25'].value or 0)
-            phase2_taxes_subtotal = float(sheet['D32'].value or 0)
+            price_column = self.PRICE_COLUMN
             
             # Calculate Fixed Amount I (D17)
-            fixed_amount_1 = phase1_attorney_subtotal + phase1_taxes_subtotal
-            sheet['D17'] = fixed_amount_1
+            fixed_amount_1 = patent_data.phase1_attorney_total + patent_data.phase1_taxes_total
+            sheet.cell(row=17, column=price_column, value=fixed_amount_1)
             
             # Calculate Fixed Amount II (D34)
-            fixed_amount_2 = phase2_attorney_subtotal + phase2_taxes_subtotal
-            sheet['D34'] = fixed_amount_2
+            fixed_amount_2 = patent_data.phase2_attorney_total + patent_data.phase2_taxes_total
+            sheet.cell(row=34, column=price_column, value=fixed_amount_2)
             
             # Calculate Direct eligible costs (D36)
             direct_costs = fixed_amount_1 + fixed_amount_2
-            sheet['D36'] = direct_costs
+            sheet.cell(row=36, column=price_column, value=direct_costs)
             
             # Calculate Indirect costs (D37) - typically 7% of direct costs
             indirect_costs = direct_costs * 0.07
-            sheet['D37'] = indirect_costs
+            sheet.cell(row=37, column=price_column, value=indirect_costs)
             
             # Calculate Total eligible costs (D38)
             total_costs = direct_costs + indirect_costs
-            sheet['D38'] = total_costs
+            sheet.cell(row=38, column=price_column, value=total_costs)
             
             # Funding requested (D39) - typically 85% of total costs
             funding_requested = total_costs * 0.85
-            sheet['D39'] = funding_requested
-            
-            logger.info(f"✅ Calculated totals:")
-            logger.info(f"   Fixed Amount I: €{fixed_amount_1:,.2f}")
-            logger.info(f"   Fixed Amount II: €{fixed_amount_2:,.2f}")
-            logger.info(f"   Direct costs: €{direct_costs:,.2f}")
-            logger.info(f"   Indirect costs: €{indirect_costs:,.2f}")
-            logger.info(f"   Total costs: €{total_costs:,.2f}")
-            logger.info(f"   Funding requested: €{funding_requested:,.2f}")
+            sheet.cell(row=39, column=price_column, value=funding_requested)
+            
+            # Thousands separators need format specs, so skip building these lines when INFO is off
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ Calculated totals:")
+                logger.info(f"   Fixed Amount I: €{fixed_amount_1:,.2f}")
+                logger.info(f"   Fixed Amount II: €{fixed_amount_2:,.2f}")
+                logger.info(f"   Direct costs: €{direct_costs:,.2f}")
+                logger.info(f"   Indirect costs: €{indirect_costs:,.2f}")
+                logger.info(f"   Total costs: €{total_costs:,.2f}")
+                logger.info(f"   Funding requested: €{funding_requested:,.2f}")
             
         except Exception as e:
             logger.error(f"❌ Error calculating totals: {e}")
@@ -326,8 +689,8 @@ class PatentExcelFiller:
 class PatentServiceAgent:
     """Main orchestrator for patent service processing"""
     
-    def __init__(self, groq_api_key: str):
-        self.analyzer = GroqPatentAnalyzer(groq_api_key)
+    def __init__(self, groq_api_key: str, cache_path: Optional[str] = None):
+        self.analyzer = GroqPatentAnalyzer(groq_api_key, cache_path)
         self.excel_filler = PatentExcelFiller()
     
     def read_data_file(self, file_path: str) -> str:
@@ -375,7 +738,7 @@ class PatentServiceAgent:
             
             # Step 4: Fill Excel form
             logger.info("🔄 STEP 4: Filling Excel Form")
-            excel_success = self.excel_filler.fill_excel_form(template_path, output_path, patent_data)
+            excel_success = self.excel_filler.fill_excel_form_fast(template_path, output_path, patent_data)
             
             if excel_success:
                 results['steps_completed'].append('excel_filled')
@@ -391,13 +754,83 @@ class PatentServiceAgent:
         
         return results
     
+    def process_many(self, jobs: List[Tuple[str, str, str]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Process several (data_file_path, template_path, output_path) jobs in a thread pool"""
+        
+        # Each job is network and disk bound, and max_workers also caps concurrent Groq calls
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda job: self.process_patent_services(*job), jobs))
+    
+    async def process_patent_services_async(self, data_file_path: str, template_path: str, output_path: str, client: AsyncGroq) -> Dict[str, Any]:
+        """Async workflow for processing patent services; Excel filling runs in a worker thread"""
+        
+        results = {
+            'success': False,
+            'steps_completed': [],
+            'patent_data': None,
+            'statistics': {},
+            'errors': []
+        }
+        
+        try:
+            # Step 1: Read data file
+            logger.info("🔄 STEP 1: Reading Data File")
+            text_content = self.read_data_file(data_file_path)
+            results['steps_completed'].append('data_file_read')
+            
+            # Step 2: Analyze with Groq API
+            logger.info("🔄 STEP 2: Analyzing Patent Services with Groq API")
+            patent_data = await self.analyzer.analyze_patent_data_async(text_content, client)
+            results['patent_data'] = patent_data
+            results['steps_completed'].append('data_analyzed')
+            
+            # Step 3: Generate statistics
+            logger.info("🔄 STEP 3: Generating Statistics")
+            statistics = self._generate_statistics(patent_data)
+            results['statistics'] = statistics
+            results['steps_completed'].append('statistics_generated')
+            
+            # Step 4: Fill Excel form; concurrent jobs share self.excel_filler from worker threads,
+            # which is safe because each fill works on its own cached template entry
+            logger.info("🔄 STEP 4: Filling Excel Form")
+            excel_success = await asyncio.to_thread(
+                self.excel_filler.fill_excel_form_fast, template_path, output_path, patent_data
+            )
+            
+            if excel_success:
+                results['steps_completed'].append('excel_filled')
+                results['success'] = True
+                logger.info("✅ PROCESS COMPLETED SUCCESSFULLY")
+            else:
+                results['errors'].append('Excel filling failed')
+                
+        except Exception as e:
+            error_msg = f"❌ Process failed at step {len(results['steps_completed']) + 1}: {e}"
+            logger.error(error_msg)
+            results['errors'].append(error_msg)
+        
+        return results
+    
+    async def process_many_async(self, jobs: List[Tuple[str, str, str]], concurrency_limit: int = 4) -> List[Dict[str, Any]]:
+        """Process several (data_file_path, template_path, output_path) jobs concurrently"""
+        
+        semaphore = asyncio.Semaphore(concurrency_limit)
+        
+        http_client = DefaultAsyncHttpxClient(limits=_GROQ_HTTP_LIMITS)
+        async with AsyncGroq(api_key=self.analyzer.api_key, http_client=http_client) as client:
+            async def run_job(job: Tuple[str, str, str]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.process_patent_services_async(*job, client)
+            
+            return await asyncio.gather(*(run_job(job) for job in jobs))
+    
     def _generate_statistics(self, patent_data: PatentData) -> Dict[str, Any]:
         """Generate comprehensive statistics"""
         
-        phase1_attorney_total = sum(s.price_eur for s in patent_data.phase1_attorney_services)
-        phase1_taxes_total = sum(s.price_eur for s in patent_data.phase1_taxes)
-        phase2_attorney_total = sum(s.price_eur for s in patent_data.phase2_attorney_services)
-        phase2_taxes_total = sum(s.price_eur for s in patent_data.phase2_taxes)
+        phase1_attorney_total = patent_data.phase1_attorney_total
+        phase1_taxes_total = patent_data.phase1_taxes_total
+        phase2_attorney_total = patent_data.phase2_attorney_total
+        phase2_taxes_total = patent_data.phase2_taxes_total
         
         total_attorney_costs = phase1_attorney_total + phase2_attorney_total
         total_tax_costs = phase1_taxes_total + phase2_taxes_total
@@ -513,9 +946,12 @@ def main_patenting(data_file_path):
         print(f"\n🔧 Initializing Patent Service Agent...")
         agent = PatentServiceAgent(GROQ_API_KEY)
         
-        # Process patent services
+        # Process patent services; always release the pooled HTTP connections, even on failure
         print(f"\n🔄 Processing patent services from {data_file_path}...")
-        results = agent.process_patent_services(data_file_path, template_path, output_path)
+        try:
+            results = agent.process_patent_services(data_file_path, template_path, output_path)
+        finally:
+            agent.analyzer.close()
         
         # Print results
         agent.print_results(results)
@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
-import openpyxl
+import ast
+import asyncio
+import hashlib
+import io
 import json
+import math
 import os
 import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 import logging
+import numpy as np
+import operator
+import orjson
 from dotenv import load_dotenv
-from groq import Groq
 
 load_dotenv()
 
@@ -16,7 +27,150 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+DEFAULT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+# "field": number op number, e.g. "allowances_bonuses": 2650 / 2
+_ARITH_RE = re.compile(r'"([^"]+)":\s*(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)')
+# "field": (number op number) op number, e.g. "increase_amount": (2650 + 265) * 0.05
+_PAREN_ARITH_RE = re.compile(r'"([^"]+)":\s*\((\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)\)\s*([+\-*/])\s*(\d+(?:\.\d+)?)')
+# An arithmetic operator applied to a number or closing parenthesis, or an opening parenthesis
+_OPERATOR_RE = re.compile(r'[\d)]\s*[+\-*/]|\(')
+
+# Columns summed in the totals row of the certificate form:
+# J months planned, K salary rate, L allowances and bonuses, M increase %, N increase amount,
+# O total excluding contribution, P total including contribution, Q DU costs,
+# U annual leave cost, V total planned remuneration
+_SUM_COLUMNS = ('J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'U', 'V')
+
+# Suggested directory for the opt-in cache of analyzed ProjectData per data text (see ProjectAnalyzer)
+PROJECT_CACHE_DIR = os.path.join(".cache", "groq_projectdata")
+# Part of the ProjectData cache key; bump it when parsing or post-processing changes so old entries are not reused
+PROJECT_CACHE_VERSION = 1
+
+# Appended to the analysis prompt when a response still contains arithmetic expressions
+PLAIN_NUMBERS_RULE = "\n\nRESPOND WITH NUMBERS ONLY: every numeric field MUST be a single pre-computed JSON number. Never include arithmetic operators (+, -, *, /) or parentheses in values."
+
+SYSTEM_PROMPT = "You are an expert data analyst specializing in extracting structured information from European Union project funding documents. You have deep knowledge of Lithuanian civil service regulations, salary coefficients, and budgetary institution requirements. Always respond with valid JSON format when requested and pay extreme attention to numerical accuracy."
+
+def _has_arithmetic(json_content: str) -> bool:
+    """Scan the JSON text once, skipping string literals, for arithmetic left in values"""
+    pos = 0
+    while True:
+        quote = json_content.find('"', pos)
+        segment = json_content[pos:] if quote == -1 else json_content[pos:quote]
+        if _OPERATOR_RE.search(segment):
+            return True
+        if quote == -1:
+            return False
+        
+        # Jump to the closing quote, ignoring escaped ones
+        end = json_content.find('"', quote + 1)
+        while end != -1:
+            escape = end - 1
+            while json_content[escape] == '\\':
+                escape -= 1
+            if (end - 1 - escape) % 2 == 0:
+                break
+            end = json_content.find('"', end + 1)
+        if end == -1:
+            return False
+        pos = end + 1
+
+_ARITH_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+def _evaluate_node(node: ast.AST) -> float:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH_OPERATORS:
+        return _ARITH_OPERATORS[type(node.op)](_evaluate_node(node.left), _evaluate_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _ARITH_OPERATORS:
+        return _ARITH_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    raise ValueError(f"Unsupported expression element: {ast.dump(node)}")
+
+@lru_cache(maxsize=512)
+def _safe_arith(expression: str) -> float:
+    """Evaluate a plain arithmetic expression such as "(2650 + 265) * 0.05" without eval()"""
+    return _evaluate_node(ast.parse(expression.strip(), mode='eval').body)
+
+def _remuneration_kernel(salaries: np.ndarray, bonuses: np.ndarray, increases: np.ndarray, posts: np.ndarray,
+                         months: np.ndarray, leave_rates: np.ndarray, contribution_rate: float) -> Tuple[np.ndarray, ...]:
+    """Remuneration formulas over float64 position arrays; the input arrays are reused as output buffers"""
+    
+    total_excluding_contribution = np.add(salaries, bonuses, out=salaries)
+    total_excluding_contribution += increases
+    total_including_contribution = np.multiply(total_excluding_contribution, 1 + contribution_rate, out=bonuses)
+    du_costs = np.multiply(posts, months, out=posts)
+    du_costs *= total_including_contribution
+    annual_leave_cost = np.multiply(du_costs, leave_rates, out=leave_rates)
+    total_planned_remuneration = np.add(du_costs, annual_leave_cost, out=increases)
+    return (total_excluding_contribution, total_including_contribution, du_costs,
+            annual_leave_cost, total_planned_remuneration)
+
+# Default justification by job title keywords, first match wins
+_JOB_DEFAULTS = (
+    (("Research",), "Research position requiring specialized expertise and qualifications"),
+    (("Coordinator", "Manager"), "Management position with coordination responsibilities"),
+    (("Technical", "Support"), "Technical position requiring specialized skills and certifications"),
+)
+_DEFAULT_JUSTIFICATION = "Position requiring appropriate qualifications and experience"
+
+def _normalize_strings(obj: Any) -> Any:
+    """Return a copy of parsed JSON with every string value stripped of surrounding whitespace"""
+    if isinstance(obj, str):
+        return obj.strip()
+    if isinstance(obj, dict):
+        return {key: _normalize_strings(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize_strings(value) for value in obj]
+    return obj
+
+def _build_justification(pos_data: Dict, coefficient: str, bonus_breakdown: str) -> str:
+    """Combine the extracted justification, coefficient and bonus info, or fall back to a job title default"""
+    justification_parts = []
+    base_justification = pos_data.get("justification", "")
+    if base_justification:
+        justification_parts.append(base_justification)
+    if coefficient:
+        justification_parts.append("Salary structure follows " + str(coefficient))
+    if bonus_breakdown:
+        justification_parts.append("Bonus structure: " + str(bonus_breakdown))
+    
+    if justification_parts:
+        return ". ".join(justification_parts)
+    
+    job_title = pos_data.get("job_title", "")
+    for keywords, default in _JOB_DEFAULTS:
+        if any(keyword in job_title for keyword in keywords):
+            return default
+    return _DEFAULT_JUSTIFICATION
+
+def _round_cents(values: np.ndarray) -> List[float]:
+    """Round an array to 2 decimals with one np.round pass, matching Python's round() exactly.
+    
+    np.round scales by 100 before rounding, so on half-cent ties it can land a cent away from round();
+    only those near-tie entries are rounded again with round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 1e-9 * np.maximum(np.abs(scaled), 1)
+    for idx in np.flatnonzero(near_tie):
+        rounded[idx] = round(float(values[idx]), 2)
+    return rounded.tolist()
+
+@lru_cache(maxsize=4)
+def _load_prompt(prompt_path: str) -> str:
+    """Read a prompt file once per path and keep it for later analyses"""
+    with open(prompt_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+@dataclass(slots=True)
 class JobPosition:
     """Data class to represent a job position with all required fields"""
     eil_no: str
@@ -39,7 +193,24 @@ class JobPosition:
     coefficient: str = ""
     bonus_breakdown: str = ""
 
-@dataclass
+# ProjectData.classification_kind values
+CLASSIFICATION_BUDGETARY = 0
+CLASSIFICATION_BUSINESS = 1
+CLASSIFICATION_OTHER = 2
+
+# Appended to every justification when the institution is budgetary
+_BUDGETARY_COMPLIANCE_NOTE = "Compliant with Lithuanian civil service regulations and institutional salary scales"
+
+def _classify(budgetary_classification: str) -> int:
+    """Map the free-text budgetary classification to a CLASSIFICATION_* value"""
+    classification = budgetary_classification.casefold()
+    if "budgetary" in classification:
+        return CLASSIFICATION_BUDGETARY
+    if "business" in classification:
+        return CLASSIFICATION_BUSINESS
+    return CLASSIFICATION_OTHER
+
+@dataclass(slots=True)
 class ProjectData:
     """Data class to represent complete project information"""
     project_code: str
@@ -49,10 +220,22 @@ class ProjectData:
     organization_type: str = ""
     budgetary_classification: str = ""
     job_positions: List[JobPosition] = None
+    classification_kind: Optional[int] = None
     
     def __post_init__(self):
         if self.job_positions is None:
             self.job_positions = []
+        if self.classification_kind is None:
+            self.classification_kind = _classify(self.budgetary_classification)
+
+def _iter_validation_issues(positions: List[JobPosition]) -> Iterator[str]:
+    """Yield a warning line for each suspicious position; only evaluated when the issues are shown"""
+    for position in positions:
+        if position.working_week_length not in (5, 6):
+            yield f"[!] {position.job_title}: Unusual working week ({position.working_week_length})"
+        
+        if position.annual_leave_allowance_rate == 0:
+            yield f"[!] {position.job_title}: Missing annual leave rate"
 
 class AnnualLeaveRateCalculator:
     """Calculate annual leave rates based on working week and leave days"""
@@ -75,52 +258,192 @@ class AnnualLeaveRateCalculator:
         }
     }
     
+    # Sorted leave days and their rates per working week, for nearest-day lookups
+    _KEYS = {week: np.asarray(sorted(rates)) for week, rates in LEAVE_RATES.items()}
+    _VALS = {week: np.asarray([rates[day] for day in sorted(rates)]) for week, rates in LEAVE_RATES.items()}
+    
     @classmethod
     def get_leave_rate(cls, working_week: int, leave_days: int) -> float:
         """Get the correct annual leave rate from reference table"""
         if working_week not in cls.LEAVE_RATES:
             working_week = 5  # Default to 5-day week
         
-        if leave_days in cls.LEAVE_RATES[working_week]:
-            return cls.LEAVE_RATES[working_week][leave_days]
+        rates = cls.LEAVE_RATES[working_week]
+        if leave_days in rates:
+            return rates[leave_days]
         
-        # If exact match not found, find closest
-        available_days = sorted(cls.LEAVE_RATES[working_week].keys())
-        closest_days = min(available_days, key=lambda x: abs(x - leave_days))
-        return cls.LEAVE_RATES[working_week][closest_days]
+        # If exact match not found, find closest (the lower day wins a tie)
+        keys = cls._KEYS[working_week]
+        idx = int(np.searchsorted(keys, leave_days))
+        if idx == len(keys) or (idx > 0 and leave_days - keys[idx - 1] <= keys[idx] - leave_days):
+            idx -= 1
+        return float(cls._VALS[working_week][idx])
+    
+    @classmethod
+    def get_leave_rates(cls, working_weeks: np.ndarray, leave_days: np.ndarray) -> np.ndarray:
+        """Vectorized get_leave_rate over arrays of working weeks and leave days"""
+        rates = np.empty(len(leave_days), dtype=np.float64)
+        weeks = np.where(np.isin(working_weeks, list(cls.LEAVE_RATES)), working_weeks, 5)  # Default to 5-day week
+        
+        for week, keys in cls._KEYS.items():
+            mask = weeks == week
+            if not mask.any():
+                continue
+            days = leave_days[mask]
+            # Nearest listed day; an exact match always wins and the lower day wins a tie
+            idx = np.searchsorted(keys, days)
+            upper = np.minimum(idx, len(keys) - 1)
+            lower = np.maximum(idx - 1, 0)
+            use_lower = (idx == len(keys)) | ((idx > 0) & (days - keys[lower] <= keys[upper] - days))
+            rates[mask] = cls._VALS[week][np.where(use_lower, lower, upper)]
+        return rates
 
 class GroqAPIClient:
     """Enhanced client to interact with Groq API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: Optional[str] = None):
+        # Imported here so Excel-only code paths do not pay the groq/httpx import cost
+        from groq import Groq
+        
+        self.api_key = api_key
         self.client = Groq(api_key=api_key)
+        
+        # Exact-match response cache: request hash -> raw response, optionally persisted to cache_path
+        self.cache_path = cache_path
+        self._cache: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()
+        if cache_path:
+            self._cache = self._load_cache(cache_path)
+    
+    @staticmethod
+    def _load_cache(cache_path: str) -> Dict[str, str]:
+        """Read the persisted response cache, treating a missing or unreadable file as empty"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable Groq cache %s: %s", cache_path, e)
+            return {}
+        if not isinstance(cache, dict):
+            logger.warning("Ignoring malformed Groq cache %s", cache_path)
+            return {}
+        return cache
+    
+    def _save_cache(self):
+        """Atomically rewrite the persisted response cache; callers hold _cache_lock"""
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.cache_path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(self._cache, file)
+            os.replace(temp_path, self.cache_path)
+            temp_path = None
+        except OSError as e:
+            logger.warning("Could not write Groq cache %s: %s", self.cache_path, e)
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
     
-    def analyze_text(self, text: str, prompt: str, model: str = "meta-llama/llama-4-scout-17b-16e-instruct") -> str:
+    @staticmethod
+    def _build_messages(text: str, prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for one document"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{prompt}\n\nText to analyze:\n{text}"}
+        ]
+    
+    @staticmethod
+    def _cache_key(text: str, prompt: str, model: str) -> str:
+        """Hash the model, prompt and document text into a cache key"""
+        return hashlib.blake2b(f"{model}\0{prompt}\0{text}".encode('utf-8')).hexdigest()
+    
+    def _store(self, entries: Dict[str, str]):
+        """Add responses to the cache and persist it when a cache_path is set"""
+        if not entries:
+            return
+        with self._cache_lock:
+            self._cache.update(entries)
+            if self.cache_path:
+                self._save_cache()
+    
+    def discard(self, text: str, prompt: str, model: str = DEFAULT_MODEL):
+        """Drop a cached response, e.g. one that turned out not to be usable"""
+        with self._cache_lock:
+            if self._cache.pop(self._cache_key(text, prompt, model), None) is not None and self.cache_path:
+                self._save_cache()
+    
+    def analyze_text(self, text: str, prompt: str, model: str = DEFAULT_MODEL, no_cache: bool = False) -> str:
         """
         Send text to Groq API for analysis using new client format
         """
         
+        cache_key = self._cache_key(text, prompt, model)
+        if not no_cache and cache_key in self._cache:
+            logger.info("Using cached Groq response")
+            return self._cache[cache_key]
+        
         try:
             completion = self.client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert data analyst specializing in extracting structured information from European Union project funding documents. You have deep knowledge of Lithuanian civil service regulations, salary coefficients, and budgetary institution requirements. Always respond with valid JSON format when requested and pay extreme attention to numerical accuracy."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{prompt}\n\nText to analyze:\n{text}"
-                    }
-                ],
+                messages=self._build_messages(text, prompt),
                 temperature=0.3
             )
             
-            return completion.choices[0].message.content
+            content = completion.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Groq API request failed: {e}")
             raise
+        
+        self._store({cache_key: content})
+        return content
+    
+    def analyze_texts(self, items: List[Tuple[str, str]], model: str = DEFAULT_MODEL,
+                      max_concurrency: int = 8, no_cache: bool = False) -> List[Union[str, Exception]]:
+        """
+        Send several (text, prompt) pairs to Groq API concurrently.
+        Results keep the order of items; a failed request yields its exception instead of a string.
+        """
+        keys = [self._cache_key(text, prompt, model) for text, prompt in items]
+        results: List[Union[str, Exception, None]] = [None if no_cache else self._cache.get(key) for key in keys]
+        
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if len(missing) < len(items):
+            logger.info(f"Using {len(items) - len(missing)} cached Groq responses")
+        if missing:
+            responses = asyncio.run(self._analyze_texts_async([items[idx] for idx in missing], model, max_concurrency))
+            for idx, response in zip(missing, responses):
+                results[idx] = response
+            self._store({keys[idx]: response for idx, response in zip(missing, responses) if isinstance(response, str)})
+        return results
+    
+    async def _analyze_texts_async(self, items: List[Tuple[str, str]], model: str,
+                                   max_concurrency: int) -> List[Union[str, Exception]]:
+        from groq import AsyncGroq
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async with AsyncGroq(api_key=self.api_key) as aclient:
+            async def request(text: str, prompt: str) -> str:
+                async with semaphore:
+                    completion = await aclient.chat.completions.create(
+                        model=model,
+                        messages=self._build_messages(text, prompt),
+                        temperature=0.3
+                    )
+                return completion.choices[0].message.content
+            
+            results = await asyncio.gather(*(request(text, prompt) for text, prompt in items), return_exceptions=True)
+        
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Groq API request failed: {result}")
+        return results
 
 class DataAnalyzer:
     """Enhanced data analyzer with improved extraction logic"""
@@ -132,9 +455,7 @@ class DataAnalyzer:
     def create_analysis_prompt(self, prompt_path: str = "code/prompts/certificate_budgetary.txt") -> str:
         """Read detailed prompt for market development service extraction from a file"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as file:
-                prompt = file.read()
-            return prompt
+            return _load_prompt(prompt_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found at: {prompt_path}")
         except Exception as e:
@@ -149,32 +470,82 @@ class DataAnalyzer:
         try:
             analysis_result = self.groq_client.analyze_text(text_content, prompt)
             logger.info("Received analysis from Groq API")
-            
-            # Extract JSON from markdown code blocks if present
-            json_content = self._extract_json_from_response(analysis_result)
-            
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}")
+            raise
+        
+        try:
+            json_content = self._plain_json(text_content, prompt, analysis_result)
+            return self._parse_analysis(json_content, analysis_result)
+        except Exception as e:
+            # Do not keep serving a response that cannot be used
+            self.groq_client.discard(text_content, prompt)
+            if not isinstance(e, json.JSONDecodeError):
+                logger.error(f"Analysis failed: {e}")
+            raise
+    
+    def analyze_many(self, text_contents: List[str]) -> List[Optional[ProjectData]]:
+        """Analyze several documents with one batch of concurrent Groq requests; failed documents yield None"""
+        
+        logger.info(f"Starting batched analysis of {len(text_contents)} documents...")
+        
+        prompt = self.create_analysis_prompt()
+        analysis_results = self.groq_client.analyze_texts([(text, prompt) for text in text_contents])
+        
+        projects = []
+        for idx, analysis_result in enumerate(analysis_results):
+            if isinstance(analysis_result, Exception):
+                projects.append(None)
+                continue
+            try:
+                json_content = self._plain_json(text_contents[idx], prompt, analysis_result)
+                projects.append(self._parse_analysis(json_content, analysis_result))
+            except Exception as e:
+                logger.error(f"Analysis of document {idx + 1} failed: {e}")
+                self.groq_client.discard(text_contents[idx], prompt)
+                projects.append(None)
+        return projects
+    
+    def _plain_json(self, text_content: str, prompt: str, analysis_result: str) -> str:
+        """Return the response JSON, asking the model once more if it still contains arithmetic expressions"""
+        
+        # Extract JSON from markdown code blocks if present
+        json_content = self._extract_json_from_response(analysis_result)
+        if not _has_arithmetic(json_content):
+            return json_content
+        
+        logger.warning("Groq response contains arithmetic expressions, requesting plain numbers")
+        try:
+            retry_result = self.groq_client.analyze_text(text_content, prompt + PLAIN_NUMBERS_RULE)
+            retry_content = self._extract_json_from_response(retry_result)
+            if not _has_arithmetic(retry_content):
+                return retry_content
+        except Exception as e:
+            logger.warning(f"Plain-number retry failed: {e}")
+        
+        # Legacy fallback: evaluate the expressions locally
+        return self._clean_json_expressions(json_content)
+    
+    def _parse_analysis(self, json_content: str, analysis_result: str) -> ProjectData:
+        """Turn the extracted response JSON into validated project data"""
+        
+        try:
             # Parse JSON response
-            parsed_data = json.loads(json_content)
-            
-            # Convert and validate data
-            project_data = self._convert_to_project_data(parsed_data)
-            
-            # Post-process to fix common errors
-            project_data = self._post_process_data(project_data)
-            
-            return project_data
-            
-        except json.JSONDecodeError as e:
+            parsed_data = orjson.loads(json_content)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
             logger.error(f"Failed to parse JSON: {e}")
             logger.error(f"Cleaned JSON content: {json_content}")
             logger.error(f"Raw response: {analysis_result}")
             raise
-        except Exception as e:
-            logger.error(f"Analysis failed: {e}")
-            raise
+        
+        # Convert and validate data
+        project_data = self._convert_to_project_data(parsed_data)
+        
+        # Post-process to fix common errors
+        return self._post_process_data(project_data)
     
     def _extract_json_from_response(self, response: str) -> str:
-        """Extract JSON content from markdown code blocks or raw response and clean invalid expressions"""
+        """Extract JSON content from markdown code blocks or raw response"""
         
         # Remove any leading/trailing whitespace
         response = response.strip()
@@ -192,7 +563,7 @@ class DataAnalyzer:
                 if end_index != -1:
                     json_content = response[start_index:end_index].strip()
                     logger.info("Extracted JSON from markdown code blocks")
-                    return self._clean_json_expressions(json_content)
+                    return json_content
         
         # Check if response contains ``` without json marker
         if response.startswith('```') and response.endswith('```'):
@@ -201,21 +572,17 @@ class DataAnalyzer:
             if json_content.startswith('json'):
                 json_content = json_content[4:].strip()
             logger.info("Extracted JSON from generic code blocks")
-            return self._clean_json_expressions(json_content)
+            return json_content
         
-        # If no code blocks, clean and return
-        logger.info("No markdown code blocks found, cleaning raw response")
-        return self._clean_json_expressions(response)
+        # If no code blocks, return the raw response
+        logger.info("No markdown code blocks found, using raw response")
+        return response
     
     def _clean_json_expressions(self, json_content: str) -> str:
-        """Clean JSON content by evaluating mathematical expressions"""
-        
-        import re
+        """Clean JSON content by evaluating mathematical expressions (fallback when the model ignores PLAIN_NUMBERS_RULE)"""
         
         # Find and replace mathematical expressions in JSON values
         # Pattern to match: "field": number / number, or "field": number * number, etc.
-        pattern = r'"([^"]+)":\s*(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)'
-        
         def evaluate_expression(match):
             field_name = match.group(1)
             num1 = float(match.group(2))
@@ -237,11 +604,9 @@ class DataAnalyzer:
             return f'"{field_name}": {result}'
         
         # Replace all mathematical expressions
-        cleaned_content = re.sub(pattern, evaluate_expression, json_content)
+        cleaned_content = _ARITH_RE.sub(evaluate_expression, json_content)
         
         # Also handle expressions in parentheses like (2650 + 265) * 0.05
-        parentheses_pattern = r'"([^"]+)":\s*\((\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)\)\s*([+\-*/])\s*(\d+(?:\.\d+)?)'
-        
         def evaluate_parentheses_expression(match):
             field_name = match.group(1)
             num1 = float(match.group(2))
@@ -278,7 +643,7 @@ class DataAnalyzer:
             return f'"{field_name}": {result}'
         
         # Replace complex expressions
-        cleaned_content = re.sub(parentheses_pattern, evaluate_parentheses_expression, cleaned_content)
+        cleaned_content = _PAREN_ARITH_RE.sub(evaluate_parentheses_expression, cleaned_content)
         
         return cleaned_content
     
@@ -287,33 +652,49 @@ class DataAnalyzer:
         
         logger.info("Post-processing data for accuracy...")
         
-        for position in project_data.job_positions:
+        positions = project_data.job_positions
+        if positions:
+            count = len(positions)
+            
             # Fix working week length (common error: 40 instead of 5)
-            if position.working_week_length == 40:
-                position.working_week_length = 5
-                logger.info(f"Fixed working week for {position.job_title}: 40 → 5")
+            working_weeks = np.fromiter((p.working_week_length for p in positions), dtype=np.int64, count=count)
+            week_fixed = working_weeks == 40
+            working_weeks[week_fixed] = 5
             
             # Recalculate annual leave rate using reference table
-            correct_rate = self.leave_calculator.get_leave_rate(
-                position.working_week_length, 
-                position.annual_leave_days
-            )
-            if abs(position.annual_leave_allowance_rate - correct_rate) > 0.001:
-                logger.info(f"Fixed leave rate for {position.job_title}: {position.annual_leave_allowance_rate} → {correct_rate}")
-                position.annual_leave_allowance_rate = correct_rate
+            leave_days = np.fromiter((p.annual_leave_days for p in positions), dtype=np.int64, count=count)
+            current_rates = np.fromiter((p.annual_leave_allowance_rate for p in positions), dtype=np.float64, count=count)
+            correct_rates = self.leave_calculator.get_leave_rates(working_weeks, leave_days)
+            rate_fixed = np.abs(current_rates - correct_rates) > 0.001
             
             # Recalculate increase amount if it seems wrong
-            if position.increase_percentage > 0:
-                base_total = position.monthly_salary_rate + position.allowances_bonuses
-                expected_increase = base_total * position.increase_percentage
-                if abs(position.increase_amount - expected_increase) > 0.01:
+            salaries = np.fromiter((p.monthly_salary_rate for p in positions), dtype=np.float64, count=count)
+            bonuses = np.fromiter((p.allowances_bonuses for p in positions), dtype=np.float64, count=count)
+            percentages = np.fromiter((p.increase_percentage for p in positions), dtype=np.float64, count=count)
+            increases = np.fromiter((p.increase_amount for p in positions), dtype=np.float64, count=count)
+            expected_increases = (salaries + bonuses) * percentages
+            increase_fixed = (percentages > 0) & (np.abs(increases - expected_increases) > 0.01)
+            
+            # Write back only the positions that needed a correction
+            for idx in np.flatnonzero(week_fixed | rate_fixed | increase_fixed):
+                position = positions[idx]
+                if week_fixed[idx]:
+                    position.working_week_length = 5
+                    logger.info(f"Fixed working week for {position.job_title}: 40 → 5")
+                if rate_fixed[idx]:
+                    correct_rate = float(correct_rates[idx])
+                    logger.info(f"Fixed leave rate for {position.job_title}: {position.annual_leave_allowance_rate} → {correct_rate}")
+                    position.annual_leave_allowance_rate = correct_rate
+                if increase_fixed[idx]:
+                    expected_increase = float(expected_increases[idx])
                     logger.info(f"Fixed increase amount for {position.job_title}: {position.increase_amount} → {expected_increase}")
                     position.increase_amount = expected_increase
         
         # Set correct contribution rate based on organization type
-        if "budgetary" in project_data.budgetary_classification.lower():
+        project_data.classification_kind = _classify(project_data.budgetary_classification)
+        if project_data.classification_kind == CLASSIFICATION_BUDGETARY:
             project_data.contribution_rate = 0.014
-        elif "business" in project_data.budgetary_classification.lower():
+        elif project_data.classification_kind == CLASSIFICATION_BUSINESS:
             project_data.contribution_rate = 0.046
         
         logger.info("Post-processing completed")
@@ -323,6 +704,8 @@ class DataAnalyzer:
         """Enhanced conversion with better error handling and field completion"""
         
         try:
+            # Strip every string once up front; the checks below rely on plain truthiness
+            parsed_data = _normalize_strings(parsed_data)
             project_info = parsed_data["project_info"]
             positions_data = parsed_data["job_positions"]
             
@@ -334,7 +717,7 @@ class DataAnalyzer:
                     # If it's an expression like "(2650 + 265) * 0.05", calculate it
                     try:
                         # Safely evaluate simple arithmetic expressions
-                        increase_amount = eval(increase_amount) if increase_amount else 0
+                        increase_amount = _safe_arith(increase_amount) if increase_amount else 0
                     except:
                         increase_amount = 0
                         logger.warning(f"Could not evaluate increase_amount expression: {pos_data.get('increase_amount')}")
@@ -343,23 +726,23 @@ class DataAnalyzer:
                 allowances_bonuses = pos_data.get("allowances_bonuses", 0)
                 if isinstance(allowances_bonuses, str) and "/" in allowances_bonuses:
                     try:
-                        allowances_bonuses = eval(allowances_bonuses)
+                        allowances_bonuses = _safe_arith(allowances_bonuses)
                     except:
                         allowances_bonuses = 0
                         logger.warning(f"Could not evaluate allowances_bonuses expression: {pos_data.get('allowances_bonuses')}")
                 
                 # Generate missing fields with intelligent defaults
                 project_impact_no = pos_data.get("project_impact_no", f"1.{idx+2}")
-                if not project_impact_no or project_impact_no.strip() == "" or project_impact_no == "1.2":
+                if not project_impact_no or project_impact_no == "1.2":
                     project_impact_no = f"1.{idx+2}"  # Sequential: 1.2, 1.3, 1.4, 1.5, etc.
                 
                 action_expenditure_type = pos_data.get("action_expenditure_type", f"1.{idx+2}.1")
-                if not action_expenditure_type or action_expenditure_type.strip() == "" or action_expenditure_type == "1.2.1":
+                if not action_expenditure_type or action_expenditure_type == "1.2.1":
                     action_expenditure_type = f"1.{idx+2}.1"  # Sequential: 1.2.1, 1.3.1, 1.4.1, etc.
                 
                 # Intelligent contract type detection
                 employment_contract = pos_data.get("employment_contract", "time-limited")
-                if not employment_contract or employment_contract.strip() == "":
+                if not employment_contract:
                     # Analyze job context for contract type
                     job_title = pos_data.get("job_title", "").lower()
                     months_planned = int(pos_data.get("months_planned", 12))
@@ -374,7 +757,7 @@ class DataAnalyzer:
                         employment_contract = "time-limited"
                 
                 salary_year = pos_data.get("salary_year", "2024")
-                if not salary_year or salary_year.strip() == "":
+                if not salary_year:
                     # Determine salary year from recruitment year
                     recruitment_year = pos_data.get("recruitment_year", "2024-01")
                     if recruitment_year:
@@ -389,32 +772,9 @@ class DataAnalyzer:
                         salary_year = "2024"
                 
                 # Enhanced justification combining all available info
-                justification_parts = []
-                base_justification = pos_data.get("justification", "")
-                if base_justification and base_justification.strip():
-                    justification_parts.append(base_justification)
-                
                 coefficient = pos_data.get("coefficient", "")
-                if coefficient and coefficient.strip():
-                    justification_parts.append(f"Salary structure follows {coefficient}")
-                
                 bonus_breakdown = pos_data.get("bonus_breakdown", "")
-                if bonus_breakdown and bonus_breakdown.strip():
-                    justification_parts.append(f"Bonus structure: {bonus_breakdown}")
-                
-                # If no justification provided, create basic one
-                if not justification_parts:
-                    job_title = pos_data.get("job_title", "")
-                    if "Research" in job_title:
-                        justification_parts.append(f"Research position requiring specialized expertise and qualifications")
-                    elif "Coordinator" in job_title or "Manager" in job_title:
-                        justification_parts.append(f"Management position with coordination responsibilities")
-                    elif "Technical" in job_title or "Support" in job_title:
-                        justification_parts.append(f"Technical position requiring specialized skills and certifications")
-                    else:
-                        justification_parts.append(f"Position requiring appropriate qualifications and experience")
-                
-                full_justification = ". ".join(justification_parts)
+                full_justification = _build_justification(pos_data, coefficient, bonus_breakdown)
                 
                 position = JobPosition(
                     eil_no=pos_data.get("eil_no", f"{idx+1}."),
@@ -460,6 +820,18 @@ class DataAnalyzer:
 class ExcelFormFiller:
     """Enhanced Excel form filler with correct calculations"""
     
+    # JobPosition attributes written as-is, and derived fields from the remuneration calculation
+    POSITION_FIELDS = (
+        'eil_no', 'project_impact_no', 'action_expenditure_type', 'job_title', 'planned_posts',
+        'employment_contract', 'recruitment_year', 'salary_year', 'months_planned', 'monthly_salary_rate',
+        'allowances_bonuses', 'increase_percentage', 'increase_amount', 'working_week_length',
+        'annual_leave_days', 'annual_leave_allowance_rate'
+    )
+    CALCULATED_FIELDS = (
+        'total_excluding_contribution', 'total_including_contribution', 'du_costs',
+        'annual_leave_cost', 'total_planned_remuneration'
+    )
+    
     def __init__(self):
         # Corrected column mapping
         self.column_mapping = {
@@ -486,40 +858,65 @@ class ExcelFormFiller:
             'total_planned_remuneration': 22,      # V
             'justification': 23                    # W
         }
-    
-    def calculate_remuneration_fields(self, position: JobPosition, contribution_rate: float) -> Dict[str, float]:
-        """Corrected calculation formulas"""
         
-        # Column O (14): Total excluding employer contribution
-        total_excluding_contribution = (
-            position.monthly_salary_rate + 
-            position.allowances_bonuses + 
-            position.increase_amount
+        # Row layout resolved once: the columns in write order and getters returning their values as tuples
+        self._row_columns = tuple(
+            self.column_mapping[name] for name in self.POSITION_FIELDS + self.CALCULATED_FIELDS + ('justification',)
         )
+        self._position_values = operator.attrgetter(*self.POSITION_FIELDS)
+        
+        # Template bytes are kept in memory so repeated fills skip the disk read
+        self._template_path = None
+        self._template_bytes = None
+    
+    def _load_template(self, template_path: str, template_size: Optional[int] = None) -> bytes:
+        """Read the template bytes unless they are already cached for this path; a known size is read in one call"""
         
-        # Column P (15): Total including employer contribution
-        total_including_contribution = total_excluding_contribution * (1 + contribution_rate)
+        if template_path != self._template_path:
+            logger.info("Loading Excel template: %s", template_path)
+            with open(template_path, 'rb') as file:
+                self._template_bytes = file.read() if template_size is None else file.read(template_size)
+            self._template_path = template_path
+        return self._template_bytes
+    
+    def open_template(self, template_path: str, template_size: Optional[int] = None):
+        """Load the template workbook, ready to be filled"""
         
-        # Column Q (16): DU costs (Posts × Months × Rate with contributions)
-        du_costs = (
-            position.planned_posts * 
-            position.months_planned * 
-            total_including_contribution
-        )
+        # Imported here so analysis-only code paths do not pay the openpyxl import cost
+        import openpyxl
         
-        # Column U (20): Annual leave cost (DU costs × Leave rate)
-        annual_leave_cost = du_costs * position.annual_leave_allowance_rate
+        # VBA, external links and rich text are never used by this form, so skip parsing them;
+        # data_only stays False so the template's own formulas survive the save
+        return openpyxl.load_workbook(
+            io.BytesIO(self._load_template(template_path, template_size)), read_only=False, keep_vba=False, data_only=False,
+            keep_links=False, rich_text=False
+        )
+    
+    def calculate_remuneration_fields(self, position: JobPosition, contribution_rate: float) -> Dict[str, float]:
+        """Corrected calculation formulas for a single position, rounded to cents"""
+        return dict(zip(self.CALCULATED_FIELDS, self.calculate_remuneration_rows([position], contribution_rate)[0]))
+    
+    def calculate_remuneration_columns(self, positions: List[JobPosition], contribution_rate: float) -> Dict[str, np.ndarray]:
+        """Remuneration formulas over arrays of all positions, unrounded"""
         
-        # Column V (21): Total planned remuneration (DU costs + Leave cost)
-        total_planned_remuneration = du_costs + annual_leave_cost
+        count = len(positions)
+        salaries = np.fromiter((p.monthly_salary_rate for p in positions), dtype=np.float64, count=count)
+        bonuses = np.fromiter((p.allowances_bonuses for p in positions), dtype=np.float64, count=count)
+        increases = np.fromiter((p.increase_amount for p in positions), dtype=np.float64, count=count)
+        posts = np.fromiter((p.planned_posts for p in positions), dtype=np.float64, count=count)
+        months = np.fromiter((p.months_planned for p in positions), dtype=np.float64, count=count)
+        leave_rates = np.fromiter((p.annual_leave_allowance_rate for p in positions), dtype=np.float64, count=count)
         
-        return {
-            'total_excluding_contribution': round(total_excluding_contribution, 2),
-            'total_including_contribution': round(total_including_contribution, 2),
-            'du_costs': round(du_costs, 2),
-            'annual_leave_cost': round(annual_leave_cost, 2),
-            'total_planned_remuneration': round(total_planned_remuneration, 2)
-        }
+        return dict(zip(
+            ('total_excluding_contribution', 'total_including_contribution', 'du_costs',
+             'annual_leave_cost', 'total_planned_remuneration'),
+            _remuneration_kernel(salaries, bonuses, increases, posts, months, leave_rates, contribution_rate)
+        ))
+    
+    def calculate_remuneration_rows(self, positions: List[JobPosition], contribution_rate: float) -> List[Tuple[float, ...]]:
+        """Rounded calculated values per position, as tuples in CALCULATED_FIELDS order"""
+        columns = self.calculate_remuneration_columns(positions, contribution_rate)
+        return list(zip(*(_round_cents(columns[name]) for name in self.CALCULATED_FIELDS)))
     
     def fill_project_header_info(self, sheet, project_data: ProjectData):
         """Enhanced header filling"""
@@ -536,22 +933,25 @@ class ExcelFormFiller:
         
         sheet['B9'] = "Type of organization"
         sheet['H9'] = project_data.organization_type
-        sheet['I9'] = "Budgetary" if "budgetary" in project_data.budgetary_classification.lower() else "Non-budgetary"
+        sheet['I9'] = "Budgetary" if project_data.classification_kind == CLASSIFICATION_BUDGETARY else "Non-budgetary"
         sheet['J9'] = f"{project_data.contribution_rate:.3f}"
         
         logger.info("Enhanced project header information filled")
 
 
-    def fill_excel_form(self, template_path: str, output_path: str, project_data: ProjectData) -> bool:
-        """Enhanced Excel filling with accurate calculations"""
+    def fill_excel_form(self, template_path: str, output_path: str, project_data: ProjectData,
+                        calculated_rows: Optional[List[Tuple[float, ...]]] = None,
+                        template_size: Optional[int] = None, workbook=None) -> bool:
+        """Enhanced Excel filling with accurate calculations; calculated_rows, template_size and an already
+        opened template workbook may be passed in if available"""
         
         try:
-            logger.info(f"Loading Excel template: {template_path}")
-            workbook = openpyxl.load_workbook(template_path)
+            if workbook is None:
+                workbook = self.open_template(template_path, template_size)
             
             sheet_name = "Certificate for budgetary autho"
             if sheet_name not in workbook.sheetnames:
-                logger.warning(f"Sheet '{sheet_name}' not found. Using first sheet.")
+                logger.warning("Sheet '%s' not found. Using first sheet.", sheet_name)
                 sheet = workbook.active
             else:
                 sheet = workbook[sheet_name]
@@ -560,78 +960,85 @@ class ExcelFormFiller:
             self.fill_project_header_info(sheet, project_data)
             
             num_positions = len(project_data.job_positions)  # Get actual number of positions
-            logger.info(f"Filling {num_positions} job positions with enhanced calculations...")
+            logger.info("Filling %d job positions with enhanced calculations...", num_positions)
             
             start_row = 15
-            total_cost = 0
             
-            for idx, position in enumerate(project_data.job_positions):
+            log_positions = logger.isEnabledFor(logging.DEBUG)  # Per-position detail is DEBUG only
+            # Classification is fixed for the whole form, so the compliance note is decided once
+            compliance_note = _BUDGETARY_COMPLIANCE_NOTE if project_data.classification_kind == CLASSIFICATION_BUDGETARY else None
+            justification_parts = []  # Reused for every position
+            
+            # Column layout and cell writer bound to locals once, outside the position loop
+            row_columns = self._row_columns
+            position_values = self._position_values
+            write_cell = sheet.cell
+            
+            # Calculate all derived fields correctly, for every position at once
+            if calculated_rows is None:
+                calculated_rows = self.calculate_remuneration_rows(project_data.job_positions, project_data.contribution_rate)
+            total_cost = sum(calculated[-1] for calculated in calculated_rows)  # For the log summary
+            
+            for idx, (position, calculated) in enumerate(zip(project_data.job_positions, calculated_rows)):
                 row = start_row + idx
                 
-                # Calculate all derived fields correctly
-                calculated = self.calculate_remuneration_fields(position, project_data.contribution_rate)
-                total_cost += calculated['total_planned_remuneration']
-                
-                # Fill all position data
-                sheet.cell(row=row, column=self.column_mapping['eil_no']).value = position.eil_no
-                sheet.cell(row=row, column=self.column_mapping['project_impact_no']).value = position.project_impact_no
-                sheet.cell(row=row, column=self.column_mapping['action_expenditure_type']).value = position.action_expenditure_type
-                sheet.cell(row=row, column=self.column_mapping['job_title']).value = position.job_title
-                sheet.cell(row=row, column=self.column_mapping['planned_posts']).value = position.planned_posts
-                sheet.cell(row=row, column=self.column_mapping['employment_contract']).value = position.employment_contract
-                sheet.cell(row=row, column=self.column_mapping['recruitment_year']).value = position.recruitment_year
-                sheet.cell(row=row, column=self.column_mapping['salary_year']).value = position.salary_year
-                sheet.cell(row=row, column=self.column_mapping['months_planned']).value = position.months_planned
-                sheet.cell(row=row, column=self.column_mapping['monthly_salary_rate']).value = position.monthly_salary_rate
-                sheet.cell(row=row, column=self.column_mapping['allowances_bonuses']).value = position.allowances_bonuses
-                sheet.cell(row=row, column=self.column_mapping['increase_percentage']).value = position.increase_percentage
-                sheet.cell(row=row, column=self.column_mapping['increase_amount']).value = position.increase_amount
-                sheet.cell(row=row, column=self.column_mapping['total_excluding_contribution']).value = calculated['total_excluding_contribution']
-                sheet.cell(row=row, column=self.column_mapping['total_including_contribution']).value = calculated['total_including_contribution']
-                sheet.cell(row=row, column=self.column_mapping['du_costs']).value = calculated['du_costs']
-                sheet.cell(row=row, column=self.column_mapping['working_week_length']).value = position.working_week_length
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_days']).value = position.annual_leave_days
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_allowance_rate']).value = position.annual_leave_allowance_rate
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_cost']).value = calculated['annual_leave_cost']
-                sheet.cell(row=row, column=self.column_mapping['total_planned_remuneration']).value = calculated['total_planned_remuneration']
-                
                 # Enhanced justification with coefficient and bonus info
-                justification_parts = []
+                justification_parts.clear()
                 if position.justification and position.justification.strip():
                     justification_parts.append(position.justification)
                 
                 if position.coefficient:
-                    justification_parts.append(f"Coefficient: {position.coefficient}")
+                    justification_parts.append("Coefficient: " + str(position.coefficient))
                 
                 if position.bonus_breakdown:
-                    justification_parts.append(f"Bonus breakdown: {position.bonus_breakdown}")
+                    justification_parts.append("Bonus breakdown: " + str(position.bonus_breakdown))
                 
                 # Add compliance information for budgetary institutions
-                if "budgetary" in project_data.budgetary_classification.lower():
-                    justification_parts.append("Compliant with Lithuanian civil service regulations and institutional salary scales")
+                if compliance_note:
+                    justification_parts.append(compliance_note)
                 
                 full_justification = " | ".join(justification_parts) if justification_parts else position.justification
                 
-                sheet.cell(row=row, column=self.column_mapping['justification']).value = full_justification
+                # Fill all position data from one row tuple
+                row_values = (*position_values(position), *calculated, full_justification)
+                for column, value in zip(row_columns, row_values):
+                    write_cell(row=row, column=column, value=value)
                 
-                logger.info(f"[OK] Filled position {idx + 1}: {position.job_title} - €{calculated['total_planned_remuneration']:,.2f}")
+                if log_positions:
+                    logger.debug("[OK] Filled position %d: %s - €%s", idx + 1, position.job_title, format(calculated[-1], ',.2f'))
+            
+            logger.info("[OK] Filled %d positions, total €%s", num_positions, format(total_cost, ',.2f'))
             
             # Add DYNAMIC sum formulas based on actual number of positions
-            logger.info(f"Adding dynamic sum formulas to row 29 for {num_positions} positions...")
+            logger.info("Adding dynamic sum formulas to row 29 for %d positions...", num_positions)
             self.add_sum_formulas(sheet, num_positions)  # Pass the number of positions
             
-            workbook.save(output_path)
-            logger.info(f"[OK] Successfully saved enhanced Excel form: {output_path}")
-            logger.info(f"💰 Total project cost: €{total_cost:,.2f}")
+            # Serialize in memory so the output file is written with a single write call
+            buffer = io.BytesIO()
+            workbook.save(buffer)
+            self._write_output(output_path, buffer)
+            logger.info("[OK] Successfully saved enhanced Excel form: %s", output_path)
+            logger.info("💰 Total project cost: €%s", format(total_cost, ',.2f'))
             
             return True
             
         except Exception as e:
-            logger.error(f"[X] Failed to fill Excel form: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[X] Failed to fill Excel form: %s", e)
             return False
 
+    @staticmethod
+    def _write_output(output_path: str, buffer: io.BytesIO):
+        """Write the serialized workbook to output_path in one go"""
+        with open(output_path, 'wb') as file:
+            file.write(buffer.getbuffer())
+    
+    def fill_excel_forms(self, jobs: List[Tuple[str, str, ProjectData]], max_workers: Optional[int] = None) -> List[bool]:
+        """Fill several (template_path, output_path, project_data) jobs in parallel worker processes"""
+        
+        tasks = [(template_path, output_path, asdict(project_data)) for template_path, output_path, project_data in jobs]
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_fill_one, tasks))
+    
     def add_sum_formulas(self, sheet, num_positions):
         """Add dynamic sum formulas based on actual number of positions"""
         
@@ -640,52 +1047,128 @@ class ExcelFormFiller:
         end_row = start_row + num_positions - 1  # e.g., if 10 positions: 15 to 24
         sum_row = 29  # Fixed sum row
         
-        # Define dynamic sum formulas
-        sum_formulas = {
-            f'J{sum_row}': f'=SUM(J{start_row}:J{end_row})',  # Number of months/hours planned
-            f'K{sum_row}': f'=SUM(K{start_row}:K{end_row})',  # Planned post salary/hourly rate, EUR
-            f'L{sum_row}': f'=SUM(L{start_row}:L{end_row})',  # Allowances and bonuses, EUR
-            f'M{sum_row}': f'=SUM(M{start_row}:M{end_row})',  # Increase, % (if applicable)
-            f'N{sum_row}': f'=SUM(N{start_row}:N{end_row})',  # Amount of increase, EUR (if applicable)
-            f'O{sum_row}': f'=SUM(O{start_row}:O{end_row})',  # Total planned remuneration excluding employer's contribution, EUR
-            f'P{sum_row}': f'=SUM(P{start_row}:P{end_row})',  # Total rate of pay for the planned salary including employer's contribution, EUR
-            f'Q{sum_row}': f'=SUM(Q{start_row}:Q{end_row})',  # Amount of DU costs to be financed, EUR
-            f'U{sum_row}': f'=SUM(U{start_row}:U{end_row})',  # Planned cost of annual leave (including employer's contributions), EUR
-            f'V{sum_row}': f'=SUM(V{start_row}:V{end_row})',  # Total planned remuneration, EUR
-        }
-        
         # Insert the formulas into the sheet
-        for cell_address, formula in sum_formulas.items():
+        log_each = logger.isEnabledFor(logging.DEBUG)
+        for column in _SUM_COLUMNS:
+            cell_address = '%s%d' % (column, sum_row)
+            formula = '=SUM(%s%d:%s%d)' % (column, start_row, column, end_row)
             sheet[cell_address] = formula
-            logger.info(f"Added dynamic formula to {cell_address}: {formula}")
+            if log_each:
+                logger.debug("Added dynamic formula to %s: %s", cell_address, formula)
         
-        logger.info(f"All sum formulas added to row {sum_row} for {num_positions} positions (rows {start_row}-{end_row})")
+        logger.info("All sum formulas added to row %d for %d positions (rows %d-%d)", sum_row, num_positions, start_row, end_row)
+
+
+# One filler per worker process, so its template cache is reused across that worker's jobs
+_worker_filler: Optional[ExcelFormFiller] = None
+
+def _project_data_from_dict(data: Dict[str, Any]) -> ProjectData:
+    """Rebuild ProjectData from the asdict() form sent to worker processes"""
+    fields = dict(data)
+    fields['job_positions'] = [JobPosition(**position) for position in fields['job_positions']]
+    return ProjectData(**fields)
+
+def _fill_one(task: Tuple[str, str, Dict[str, Any]]) -> bool:
+    """Worker entry point for ExcelFormFiller.fill_excel_forms"""
+    global _worker_filler
+    if _worker_filler is None:
+        _worker_filler = ExcelFormFiller()
+    template_path, output_path, project_data = task
+    return _worker_filler.fill_excel_form(template_path, output_path, _project_data_from_dict(project_data))
 
 
 class ProjectAnalyzer:
     """Enhanced main orchestrator with better error handling"""
     
-    def __init__(self, groq_api_key: str):
-        self.groq_client = GroqAPIClient(groq_api_key)
+    def __init__(self, groq_api_key: str, cache_path: Optional[str] = None,
+                 project_cache_dir: Optional[str] = None):
+        self.groq_client = GroqAPIClient(groq_api_key, cache_path)
         self.data_analyzer = DataAnalyzer(self.groq_client)
         self.excel_filler = ExcelFormFiller()
+        
+        # Analyzed ProjectData per data text, on disk when project_cache_dir is given (e.g. PROJECT_CACHE_DIR);
+        # DISABLE_GROQ_CACHE=1 turns it off
+        if os.environ.get("DISABLE_GROQ_CACHE", "").lower() in ("1", "true", "yes"):
+            project_cache_dir = None
+        self.project_cache_dir = project_cache_dir
+    
+    def clear_project_cache(self) -> int:
+        """Delete every cached ProjectData entry; returns the number of files removed"""
+        
+        if not self.project_cache_dir or not os.path.isdir(self.project_cache_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(self.project_cache_dir):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.project_cache_dir, name))
+                    removed += 1
+                except OSError as e:
+                    logger.warning("Could not remove project cache entry %s: %s", name, e)
+        return removed
     
-    def read_data_file(self, file_path: str) -> str:
-        """Read content from data file with better encoding handling"""
+    def _analyze_cached(self, text_content: str) -> ProjectData:
+        """Analyze text_content, reusing a previous analysis of the same text and prompt from disk"""
+        
+        if not self.project_cache_dir:
+            return self.data_analyzer.analyze_project_data(text_content)
+        
+        prompt = self.data_analyzer.create_analysis_prompt()
+        key = hashlib.blake2b(
+            f"{PROJECT_CACHE_VERSION}\0{DEFAULT_MODEL}\0{prompt}\0{text_content}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+        cache_file = os.path.join(self.project_cache_dir, f"{key}.json")
+        
         try:
+            with open(cache_file, 'rb') as file:
+                project_data = _project_data_from_dict(orjson.loads(file.read()))
+            logger.info("Using cached project analysis: %s", cache_file)
+            return project_data
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning("Ignoring unreadable project cache %s: %s", cache_file, e)
+        
+        project_data = self.data_analyzer.analyze_project_data(text_content)
+        
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        try:
+            os.makedirs(self.project_cache_dir, exist_ok=True)
+            temp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'wb') as file:
+                file.write(orjson.dumps(project_data))
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.warning("Could not write project cache %s: %s", cache_file, e)
+        return project_data
+    
+    def read_data_file(self, file_path: str, max_bytes: Optional[int] = None, size: Optional[int] = None) -> str:
+        """Read content from data file with better encoding handling; files over max_bytes keep only the first max_bytes characters"""
+        try:
+            if size is None:
+                size = os.path.getsize(file_path)
+            if max_bytes is not None and size > max_bytes:
+                logger.warning("[!] Data file %s is %d bytes, keeping the first %d characters", file_path, size, max_bytes)
+                size = max_bytes
             with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            logger.info(f"[OK] Successfully read data file: {file_path} ({len(content)} characters)")
+                # UTF-8 never has more characters than bytes, so this reads the whole file in one sized call
+                content = file.read(size)
+            logger.info("[OK] Successfully read data file: %s (%d bytes)", file_path, size)
             return content
         except FileNotFoundError:
-            logger.error(f"[X] Data file not found: {file_path}")
+            logger.error("[X] Data file not found: %s", file_path)
             raise
         except Exception as e:
-            logger.error(f"[X] Error reading data file: {e}")
+            logger.error("[X] Error reading data file: %s", e)
             raise
     
-    def analyze_and_process(self, data_file_path: str, template_path: str, output_path: str) -> Dict[str, Any]:
-        """Enhanced complete workflow with detailed logging"""
+    def analyze_and_process(self, data_file_path: str, template_path: str, output_path: str,
+                            file_stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, Any]:
+        """Enhanced complete workflow with detailed logging; file_stats holds os.stat results already taken by the caller"""
+        
+        file_stats = file_stats or {}
+        data_stat = file_stats.get(data_file_path)
+        template_stat = file_stats.get(template_path)
         
         results = {
             'success': False,
@@ -698,24 +1181,40 @@ class ProjectAnalyzer:
         try:
             # Step 1: Read data file
             logger.info("[STEP] STEP 1: Reading Data File")
-            text_content = self.read_data_file(data_file_path)
+            text_content = self.read_data_file(data_file_path, size=data_stat.st_size if data_stat else None)
             results['steps_completed'].append('data_file_read')
             
             # Step 2: Enhanced analysis with Groq API
             logger.info("[STEP] STEP 2: Enhanced Analysis with Groq API")
-            project_data = self.data_analyzer.analyze_project_data(text_content)
+            # The template is opened in the background while the API request is in flight
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                template_future = executor.submit(
+                    self.excel_filler.open_template, template_path, template_stat.st_size if template_stat else None
+                )
+                project_data = self._analyze_cached(text_content)
             results['project_data'] = project_data
             results['steps_completed'].append('data_analyzed')
             
             # Step 3: Generate enhanced statistics
             logger.info("[STEP] STEP 3: Generating Enhanced Statistics")
-            statistics = self._generate_enhanced_statistics(project_data)
+            # Remuneration fields are calculated once and shared by the statistics and the Excel fill
+            calculated_rows = self.excel_filler.calculate_remuneration_rows(
+                project_data.job_positions, project_data.contribution_rate
+            )
+            statistics = self._generate_enhanced_statistics(project_data, calculated_rows)
             results['statistics'] = statistics
             results['steps_completed'].append('statistics_generated')
             
             # Step 4: Fill Excel with enhanced accuracy
             logger.info("[STEP] STEP 4: Filling Excel Form with Enhanced Accuracy")
-            excel_success = self.excel_filler.fill_excel_form(template_path, output_path, project_data)
+            try:
+                workbook = template_future.result()
+            except Exception:
+                workbook = None  # fill_excel_form retries the load and reports the failure
+            excel_success = self.excel_filler.fill_excel_form(
+                template_path, output_path, project_data, calculated_rows,
+                template_size=template_stat.st_size if template_stat else None, workbook=workbook
+            )
             
             if excel_success:
                 results['steps_completed'].append('excel_filled')
@@ -731,42 +1230,44 @@ class ProjectAnalyzer:
         
         return results
     
-    def _generate_enhanced_statistics(self, project_data: ProjectData) -> Dict[str, Any]:
+    def _generate_enhanced_statistics(self, project_data: ProjectData,
+                                      calculated_rows: Optional[List[Tuple[float, ...]]] = None) -> Dict[str, Any]:
         """Generate enhanced statistics with validation info"""
         
         total_positions = len(project_data.job_positions)
-        total_staff = sum(pos.planned_posts for pos in project_data.job_positions)
-        total_months = sum(pos.months_planned * pos.planned_posts for pos in project_data.job_positions)
         
-        # Enhanced financial calculations
-        total_salaries = 0
-        total_bonuses = 0
-        total_increases = 0
-        total_remuneration = 0
+        # Staffing totals are accumulated in a single pass; money amounts are collected
+        # and summed with math.fsum afterwards so cents do not drift on long projects
+        total_staff = 0
+        total_months = 0
+        salary_parts = []
+        bonus_parts = []
+        increase_parts = []
+        remuneration_parts = []
         
         position_summary = []
-        validation_issues = []
         
-        for position in project_data.job_positions:
-            calculated = self.excel_filler.calculate_remuneration_fields(position, project_data.contribution_rate)
-            
-            position_cost = calculated['total_planned_remuneration']
-            total_remuneration += position_cost
-            total_salaries += position.monthly_salary_rate * position.months_planned * position.planned_posts
-            total_bonuses += position.allowances_bonuses * position.months_planned * position.planned_posts
-            total_increases += position.increase_amount * position.months_planned * position.planned_posts
-            
-            # Validation checks
-            if position.working_week_length not in [5, 6]:
-                validation_issues.append(f"[!] {position.job_title}: Unusual working week ({position.working_week_length})")
+        if calculated_rows is None:
+            calculated_rows = self.excel_filler.calculate_remuneration_rows(
+                project_data.job_positions, project_data.contribution_rate
+            )
+        
+        for position, calculated in zip(project_data.job_positions, calculated_rows):
+            planned_posts = position.planned_posts
+            months_planned = position.months_planned
+            total_staff += planned_posts
+            total_months += months_planned * planned_posts
             
-            if position.annual_leave_allowance_rate == 0:
-                validation_issues.append(f"[!] {position.job_title}: Missing annual leave rate")
+            position_cost = calculated[-1]  # total_planned_remuneration
+            remuneration_parts.append(position_cost)
+            salary_parts.append(position.monthly_salary_rate * months_planned * planned_posts)
+            bonus_parts.append(position.allowances_bonuses * months_planned * planned_posts)
+            increase_parts.append(position.increase_amount * months_planned * planned_posts)
             
             position_summary.append({
                 'job_title': position.job_title,
-                'planned_posts': position.planned_posts,
-                'months_planned': position.months_planned,
+                'planned_posts': planned_posts,
+                'months_planned': months_planned,
                 'total_cost': position_cost,
                 'coefficient': position.coefficient,
                 'leave_rate': f"{position.annual_leave_allowance_rate * 100:.2f}%"
@@ -787,13 +1288,12 @@ class ProjectAnalyzer:
                 'total_work_months': total_months
             },
             'financial': {
-                'total_salaries': round(total_salaries, 2),
-                'total_bonuses': round(total_bonuses, 2),
-                'total_increases': round(total_increases, 2),
-                'total_project_cost': round(total_remuneration, 2)
+                'total_salaries': round(math.fsum(salary_parts), 2),
+                'total_bonuses': round(math.fsum(bonus_parts), 2),
+                'total_increases': round(math.fsum(increase_parts), 2),
+                'total_project_cost': round(math.fsum(remuneration_parts), 2)
             },
-            'position_breakdown': position_summary,
-            'validation_issues': validation_issues
+            'position_breakdown': position_summary
         }
         
         return statistics
@@ -801,62 +1301,79 @@ class ProjectAnalyzer:
     def print_enhanced_results(self, results: Dict[str, Any]):
         """Print comprehensive results with validation info"""
         
-        print("\n" + "="*80)
-        print("[>] ENHANCED PROJECT DATA ANALYSIS AND EXCEL FORM FILLING RESULTS")
-        print("="*80)
+        # Lines are collected and written to stdout in one call
+        lines = ["\n" + "="*80, "[>] ENHANCED PROJECT DATA ANALYSIS AND EXCEL FORM FILLING RESULTS", "="*80]
+        add = lines.append
         
         # Process Status
         status_icon = "[OK] SUCCESS" if results['success'] else "[X] FAILED"
-        print(f"\n[STEP] PROCESS STATUS: {status_icon}")
-        print(f"[STEP] Steps Completed: {', '.join(results['steps_completed'])}")
+        add(f"\n[STEP] PROCESS STATUS: {status_icon}")
+        add(f"[STEP] Steps Completed: {', '.join(results['steps_completed'])}")
         
         if results['errors']:
-            print(f"[!]  Errors: {'; '.join(results['errors'])}")
+            add(f"[!]  Errors: {'; '.join(results['errors'])}")
         
         # Project Overview
         if results['project_data']:
             stats = results['statistics']
             overview = stats['project_overview']
             
-            print(f"\n[SUMMARY] PROJECT OVERVIEW")
-            print(f"   Project Code: {overview['project_code']}")
-            print(f"   Organization: {overview['organization']}")
-            print(f"   Duration: {overview['duration_months']} months")
-            print(f"   Contribution Rate: {overview['contribution_rate']}")
-            print(f"   Organization Type: {overview['organization_type']}")
-            print(f"   Budgetary Classification: {overview['budgetary_classification']}")
+            add("\n[SUMMARY] PROJECT OVERVIEW")
+            add(f"   Project Code: {overview['project_code']}")
+            add(f"   Organization: {overview['organization']}")
+            add(f"   Duration: {overview['duration_months']} months")
+            add(f"   Contribution Rate: {overview['contribution_rate']}")
+            add(f"   Organization Type: {overview['organization_type']}")
+            add(f"   Budgetary Classification: {overview['budgetary_classification']}")
             
             # Staffing Statistics
             staffing = stats['staffing']
-            print(f"\n👥 STAFFING STATISTICS")
-            print(f"   Total Job Positions: {staffing['total_positions']}")
-            print(f"   Total Staff Count: {staffing['total_staff']}")
-            print(f"   Total Work Months: {staffing['total_work_months']}")
+            add("\n👥 STAFFING STATISTICS")
+            add(f"   Total Job Positions: {staffing['total_positions']}")
+            add(f"   Total Staff Count: {staffing['total_staff']}")
+            add(f"   Total Work Months: {staffing['total_work_months']}")
             
             # Financial Statistics
             financial = stats['financial']
-            print(f"\n💰 FINANCIAL SUMMARY")
-            print(f"   Total Salaries: €{financial['total_salaries']:,.2f}")
-            print(f"   Total Bonuses: €{financial['total_bonuses']:,.2f}")
-            print(f"   Total Increases: €{financial['total_increases']:,.2f}")
-            print(f"   TOTAL PROJECT COST: €{financial['total_project_cost']:,.2f}")
+            add("\n💰 FINANCIAL SUMMARY")
+            add(f"   Total Salaries: €{financial['total_salaries']:,.2f}")
+            add(f"   Total Bonuses: €{financial['total_bonuses']:,.2f}")
+            add(f"   Total Increases: €{financial['total_increases']:,.2f}")
+            add(f"   TOTAL PROJECT COST: €{financial['total_project_cost']:,.2f}")
             
             # Enhanced Position Breakdown
-            print(f"\n[STEP] ENHANCED POSITION BREAKDOWN")
+            add("\n[STEP] ENHANCED POSITION BREAKDOWN")
             for pos in stats['position_breakdown']:
                 coefficient_info = f" (Coeff: {pos['coefficient']})" if pos['coefficient'] else ""
-                print(f"   • {pos['job_title']}{coefficient_info}: {pos['planned_posts']} staff × {pos['months_planned']} months")
-                print(f"     Leave Rate: {pos['leave_rate']} | Cost: €{pos['total_cost']:,.2f}")
-            
-            # Validation Issues
-            if stats['validation_issues']:
-                print(f"\n[!]  VALIDATION ISSUES DETECTED")
-                for issue in stats['validation_issues']:
-                    print(f"   {issue}")
+                add(f"   • {pos['job_title']}{coefficient_info}: {pos['planned_posts']} staff × {pos['months_planned']} months")
+                add(f"     Leave Rate: {pos['leave_rate']} | Cost: €{pos['total_cost']:,.2f}")
+            
+            # Validation Issues, checked only here where they are shown
+            validation_issues = list(_iter_validation_issues(results['project_data'].job_positions))
+            if validation_issues:
+                add("\n[!]  VALIDATION ISSUES DETECTED")
+                for issue in validation_issues:
+                    add(f"   {issue}")
             else:
-                print(f"\n[OK] ALL VALIDATIONS PASSED")
+                add("\n[OK] ALL VALIDATIONS PASSED")
         
-        print("\n" + "="*80)
+        add("\n" + "="*80)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+# Printed by main_budgetary_auth after a successful run
+_SUCCESS_NOTES = """
+[RESULT] KEY IMPROVEMENTS APPLIED:
+   • [OK] Correct working week values (5-day = 5, not 40)
+   • [OK] Accurate annual leave rates from reference table
+   • [OK] Proper salary increase calculations including bonuses
+   • [OK] Enhanced coefficient and bonus extraction
+   • [OK] Correct employer contribution calculations
+   • [OK] Post-processing validation and error correction
+   • [OK] Enhanced justification with coefficient details
+
+[SUMMARY] Open the file to see the perfectly structured data!
+"""
 
 def main_budgetary_auth(data_file_path):
     """Enhanced main function with better error handling"""
@@ -878,7 +1395,14 @@ def main_budgetary_auth(data_file_path):
     
     # Validate required files exist
     required_files = [data_file_path, template_path]
-    missing_files = [f for f in required_files if not os.path.exists(f)]
+    # One stat per file; the results are reused to size the reads later on
+    missing_files = []
+    file_stats = {}
+    for f in required_files:
+        try:
+            file_stats[f] = os.stat(f)
+        except FileNotFoundError:
+            missing_files.append(f)
     
     if missing_files:
         print(f"[X] Missing required files: {', '.join(missing_files)}")
@@ -894,31 +1418,26 @@ def main_budgetary_auth(data_file_path):
         
         # Run enhanced analysis and processing
         print(f"\n[STEP] Starting enhanced analysis of {data_file_path}...")
-        results = analyzer.analyze_and_process(data_file_path, template_path, output_path)
+        results = analyzer.analyze_and_process(data_file_path, template_path, output_path, file_stats)
         
         # Print enhanced results
         analyzer.print_enhanced_results(results)
         
         if results['success']:
-            print(f"\n[OK] Enhanced Excel form successfully filled: {output_path}")
-            print("\n[RESULT] KEY IMPROVEMENTS APPLIED:")
-            print("   • [OK] Correct working week values (5-day = 5, not 40)")
-            print("   • [OK] Accurate annual leave rates from reference table")
-            print("   • [OK] Proper salary increase calculations including bonuses")
-            print("   • [OK] Enhanced coefficient and bonus extraction")
-            print("   • [OK] Correct employer contribution calculations")
-            print("   • [OK] Post-processing validation and error correction")
-            print("   • [OK] Enhanced justification with coefficient details")
-            print("\n[SUMMARY] Open the file to see the perfectly structured data!")
+            output = [f"\n[OK] Enhanced Excel form successfully filled: {output_path}\n", _SUCCESS_NOTES]
             
             # Additional success information
             if results['project_data']:
                 total_positions = len(results['project_data'].job_positions)
                 total_cost = results['statistics']['financial']['total_project_cost']
-                print(f"\n[STATS] PROCESSING SUMMARY:")
-                print(f"   • Extracted {total_positions} job positions")
-                print(f"   • Total project budget: €{total_cost:,.2f}")
-                print(f"   • All calculations validated and corrected")
+                output.append(
+                    f"\n[STATS] PROCESSING SUMMARY:\n"
+                    f"   • Extracted {total_positions} job positions\n"
+                    f"   • Total project budget: €{total_cost:,.2f}\n"
+                    f"   • All calculations validated and corrected\n"
+                )
+            sys.stdout.write("".join(output))
+            sys.stdout.flush()
                 
         else:
             print(f"\n[X] Process failed. Check the detailed logs above.")
@@ -931,9 +1450,11 @@ def main_budgetary_auth(data_file_path):
     except Exception as e:
         logger.error(f"[X] Fatal error in main process: {e}")
         print(f"\n[X] Fatal error: {e}")
-        print("\n[DEBUG] DEBUG INFORMATION:")
-        import traceback
-        traceback.print_exc(limit=3)
+        # Full traceback only when debugging, so normal runs skip importing and formatting it
+        if os.environ.get("DEBUG", "").lower() in ("1", "true", "yes"):
+            print("\n[DEBUG] DEBUG INFORMATION:")
+            import traceback
+            traceback.print_exc(limit=3)
         
         print("\n[TIP] COMMON SOLUTIONS:")
         print("   • Check your Groq API key is valid and has credits")
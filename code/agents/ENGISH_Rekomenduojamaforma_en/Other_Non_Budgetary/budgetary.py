@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import hashlib
 import openpyxl
 import json
+import operator
 import os
 import re
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
 import logging
+import numpy as np
+import orjson
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, Groq
 
 load_dotenv()
 
@@ -16,7 +22,18 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+DEFAULT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+# Suggested on-disk response cache location; caching is opt-in via ProjectAnalyzer(cache_dir=GROQ_CACHE_DIR)
+GROQ_CACHE_DIR = os.path.join(".cache", "groq_nonbudgetary")
+
+# Columns summed in row 33 of the form, as (letter, index):
+# J months/hours planned, K salary rate, L increase %, M increase amount, N total excluding contribution,
+# O total including contribution, S annual leave cost, T total R&D fee, U total planned remuneration
+_SUM_COLUMNS = (
+    ('J', 10), ('K', 11), ('L', 12), ('M', 13), ('N', 14), ('O', 15), ('S', 19), ('T', 20), ('U', 21),
+)
+
+@dataclass(slots=True)
 class JobPosition:
     """Data class to represent a job position with all required fields according to the Excel form"""
     eil_no: str
@@ -43,7 +60,7 @@ class JobPosition:
     coefficient: str = ""
     bonus_breakdown: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class ProjectData:
     """Data class to represent complete project information"""
     project_code: str
@@ -79,52 +96,293 @@ class AnnualLeaveRateCalculator:
         }
     }
     
-    @classmethod
-    def get_leave_rate(cls, working_week: int, leave_days: int) -> float:
+    @staticmethod
+    def get_leave_rate(working_week: int, leave_days: int) -> float:
         """Get the correct annual leave rate from reference table"""
-        if working_week not in cls.LEAVE_RATES:
-            working_week = 5  # Default to 5-day week
-        
-        if leave_days in cls.LEAVE_RATES[working_week]:
-            return cls.LEAVE_RATES[working_week][leave_days]
-        
-        # If exact match not found, find closest
-        available_days = sorted(cls.LEAVE_RATES[working_week].keys())
-        closest_days = min(available_days, key=lambda x: abs(x - leave_days))
-        return cls.LEAVE_RATES[working_week][closest_days]
+        # Plain-list copy of the table: indexing it with a Python int is cheaper than a NumPy scalar read
+        rates = _LEAVE_TABLE_ROWS[1 if working_week == 6 else 0]  # Default to 5-day week
+        if 0 <= leave_days < _LEAVE_DAYS_SIZE:
+            return rates[int(leave_days)]
+        return rates[0 if leave_days < 0 else _LEAVE_DAYS_SIZE - 1]
+    
+    @staticmethod
+    def get_leave_rates(working_weeks: np.ndarray, leave_days: np.ndarray) -> np.ndarray:
+        """Vectorized get_leave_rate over arrays of working weeks and leave days"""
+        days = np.clip(leave_days, 0, _LEAVE_DAYS_SIZE - 1)
+        return _LEAVE_TABLE[(working_weeks == 6).astype(np.intp), days]
+
+_LEAVE_DAYS_SIZE = 64
+
+def _leave_rate_table() -> np.ndarray:
+    """Rates indexed by [0 for a 5-day / 1 for a 6-day week, leave days]; days missing from
+    LEAVE_RATES take the rate of the closest listed day, so lookups need no fallback"""
+    table = np.empty((2, _LEAVE_DAYS_SIZE))
+    for week_idx, working_week in enumerate((5, 6)):
+        rates = AnnualLeaveRateCalculator.LEAVE_RATES[working_week]
+        listed = sorted(rates)
+        for days in range(_LEAVE_DAYS_SIZE):
+            table[week_idx, days] = rates[min(listed, key=lambda x: abs(x - days))]
+    return table
+
+_LEAVE_TABLE = _leave_rate_table()
+_LEAVE_TABLE_ROWS = _LEAVE_TABLE.tolist()
 
 class GroqAPIClient:
     """Enhanced client to interact with Groq API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: Optional[str] = None):
+        self.api_key = api_key
         self.client = Groq(api_key=api_key)
+        # Responses keyed by model, prompt and text: in memory for this process, on disk when cache_dir is set
+        self.cache_dir = cache_dir
+        self._memory_cache: Dict[str, str] = {}
     
-    def analyze_text(self, text: str, prompt: str, model: str = "meta-llama/llama-4-scout-17b-16e-instruct") -> str:
+    @staticmethod
+    def _cache_key(text: str, prompt: str, model: str) -> str:
+        return hashlib.blake2b(f"{model}\0{prompt}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None"""
+        content = self._memory_cache.get(key)
+        if content is not None or not self.cache_dir:
+            return content
+        cache_file = os.path.join(self.cache_dir, f"{key}.txt")
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Ignoring unreadable Groq cache %s: %s", cache_file, e)
+            return None
+        logger.info("Using cached Groq response: %s", cache_file)
+        self._memory_cache[key] = content
+        return content
+    
+    def _cache_put(self, key: str, content: str) -> None:
+        self._memory_cache[key] = content
+        if not self.cache_dir:
+            return
+        cache_file = os.path.join(self.cache_dir, f"{key}.txt")
+        
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                file.write(content)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.warning("Could not write Groq cache %s: %s", cache_file, e)
+        finally:
+            if os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+    
+    def discard(self, text: str, prompt: str, model: str = DEFAULT_MODEL) -> None:
+        """Drop a cached response, e.g. one that turned out not to be valid JSON"""
+        key = self._cache_key(text, prompt, model)
+        self._memory_cache.pop(key, None)
+        if self.cache_dir:
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}.txt"))
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _build_messages(text: str, prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for one document"""
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert data analyst specializing in extracting structured information from European Union project funding documents. You have deep knowledge of Lithuanian civil service regulations, salary coefficients, and budgetary institution requirements. Always respond with valid JSON format when requested and pay extreme attention to numerical accuracy."
+            },
+            {
+                "role": "user",
+                "content": f"{prompt}\n\nText to analyze:\n{text}"
+            }
+        ]
+    
+    def analyze_text(self, text: str, prompt: str, model: str = DEFAULT_MODEL) -> str:
         """
         Send text to Groq API for analysis using new client format
         """
         
+        key = self._cache_key(text, prompt, model)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=self._build_messages(text, prompt),
+                temperature=0.3,
+                stream=True
+            )
+            
+            # Collect the deltas as they arrive instead of waiting for one large response body
+            content = "".join([chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices])
+            self._cache_put(key, content)
+            return content
+            
+        except Exception as e:
+            logger.error(f"Groq API request failed: {e}")
+            raise
+    
+    async def analyze_text_async(self, text: str, prompt: str, model: str = DEFAULT_MODEL,
+                                 aclient: Optional[AsyncGroq] = None) -> str:
+        """
+        Async analyze_text; pass aclient to share one AsyncGroq connection pool between requests
+        """
+        
+        if aclient is None:
+            async with AsyncGroq(api_key=self.api_key) as aclient:
+                return await self.analyze_text_async(text, prompt, model, aclient)
+        
+        key = self._cache_key(text, prompt, model)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            completion = self.client.chat.completions.create(
+            completion = await aclient.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert data analyst specializing in extracting structured information from European Union project funding documents. You have deep knowledge of Lithuanian civil service regulations, salary coefficients, and budgetary institution requirements. Always respond with valid JSON format when requested and pay extreme attention to numerical accuracy."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{prompt}\n\nText to analyze:\n{text}"
-                    }
-                ],
+                messages=self._build_messages(text, prompt),
                 temperature=0.3
             )
             
-            return completion.choices[0].message.content
+            content = completion.choices[0].message.content
+            self._cache_put(key, content)
+            return content
             
         except Exception as e:
             logger.error(f"Groq API request failed: {e}")
             raise
+    
+    async def analyze_many(self, texts: List[str], prompt: str, model: str = DEFAULT_MODEL,
+                           concurrency: int = 8) -> List[str]:
+        """
+        Analyze several documents with the same prompt concurrently, at most `concurrency` requests at a time.
+        Results keep the order of texts; run it with asyncio.run(client.analyze_many(...)).
+        """
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with AsyncGroq(api_key=self.api_key) as aclient:
+            async def analyze_one(text: str) -> str:
+                async with semaphore:
+                    return await self.analyze_text_async(text, prompt, model, aclient)
+            
+            return await asyncio.gather(*(analyze_one(text) for text in texts))
+
+def _divide(left: float, right: float) -> float:
+    """Division where dividing by zero gives 0"""
+    return left / right if right != 0 else 0
+
+# Operators allowed in value expressions, applied with one dict lookup
+_EXPRESSION_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': _divide}
+# A subtraction between two numbers; '-' alone also shows up in dates and hyphenated text
+_SUBTRACTION_RE = re.compile(r'\d\s*-\s*\d')
+
+def _scan_number(text: str, pos: int) -> int:
+    """Return the end of the `digits[.digits]` number starting at pos, or -1 if there is none"""
+    length = len(text)
+    end = pos
+    while end < length and text[end].isdecimal():
+        end += 1
+    if end == pos:
+        return -1
+    if end + 1 < length and text[end] == '.' and text[end + 1].isdecimal():
+        end += 2
+        while end < length and text[end].isdecimal():
+            end += 1
+    return end
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Return the first non-whitespace position at or after pos"""
+    length = len(text)
+    while pos < length and text[pos].isspace():
+        pos += 1
+    return pos
+
+def _remuneration_kernel(salary, increase, contribution_rate, leave_rate, months):
+    """Form formulas for columns N, O, S, T and U, on plain floats or elementwise on float64 arrays"""
+    
+    total_excluding_contribution = salary + increase                              # N = K + M
+    total_including_contribution = total_excluding_contribution * (1 + contribution_rate)  # O
+    annual_leave_cost = total_including_contribution * leave_rate * months        # S
+    total_rd_fee = total_including_contribution + annual_leave_cost               # T = O + S
+    total_planned_remuneration = total_rd_fee + months                            # U = T + J
+    return (total_excluding_contribution, total_including_contribution, annual_leave_cost,
+            total_rd_fee, total_planned_remuneration)
+
+def _round_cents(values: np.ndarray) -> List[float]:
+    """Round an array to 2 decimals with one np.round pass, matching Python's round() exactly.
+    
+    np.round scales by 100 before rounding, so on half-cent ties it can land a cent away from round();
+    only those near-tie entries are rounded again with round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 1e-9 * np.maximum(np.abs(scaled), 1)
+    for idx in np.flatnonzero(near_tie):
+        rounded[idx] = round(float(values[idx]), 2)
+    return rounded.tolist()
+
+@lru_cache(maxsize=4)
+def _load_prompt(prompt_path: str) -> str:
+    """Read a prompt file once per path and keep it for later analyses"""
+    with open(prompt_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+# Fields copied from the Groq response as given: (name, default when the key is missing)
+_POSITION_TEXT_FIELDS = (
+    ("duties_in_orp", "Project-related duties"),
+    ("position_function", "Unknown Position"),
+    ("remuneration_year", "2024"),
+)
+# Numeric fields: (name, type, default when the key is missing)
+_POSITION_NUMBER_FIELDS = (
+    ("months_hours_planned", int, 12),
+    ("planned_salary_rate", float, 0),
+    ("increase_percentage", float, 0),
+    ("increase_amount", float, 0),
+    ("total_including_contribution", float, 0),
+    ("working_week_length", int, 5),
+    ("annual_leave_days", int, 20),
+    ("annual_leave_rate", float, 0.0863),
+    ("annual_leave_cost", float, 0),
+    ("total_rd_fee", float, 0),
+    ("total_planned_remuneration", float, 0),
+)
+_PROJECT_TEXT_FIELDS = (
+    ("project_code", ""),
+    ("organization_name", ""),
+    ("organization_type", ""),
+    ("budgetary_classification", "budgetary"),
+)
+_PROJECT_NUMBER_FIELDS = (
+    ("project_duration_months", int, 0),
+    ("contribution_rate", float, 0.014),
+)
+
+def _position_numbers(idx: int):
+    """Default (eil_no, project_impact_no, action_expenditure_no) for the position at idx: 1, 1.2, 1.2.1 and so on"""
+    return str(idx+1), f"1.{idx+2}", f"1.{idx+2}.1"
+
+# Default numbers for the first positions, built once; forms rarely have more
+_POSITION_NUMBERS = tuple(_position_numbers(idx) for idx in range(64))
+
+def _coerce_fields(data: Dict[str, Any], text_fields, number_fields) -> Dict[str, Any]:
+    """Read text and numeric fields from a parsed JSON object in one pass, applying defaults and types"""
+    get = data.get
+    fields = {name: get(name, default) for name, default in text_fields}
+    for name, cast, default in number_fields:
+        fields[name] = cast(get(name, default))
+    return fields
 
 class DataAnalyzer:
     """Enhanced data analyzer with improved extraction logic"""
@@ -136,9 +394,7 @@ class DataAnalyzer:
     def create_analysis_prompt(self, prompt_path: str = "code/prompts/non_budgetary.txt") -> str:
         """Read detailed prompt for market development service extraction from a file"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as file:
-                prompt = file.read()
-            return prompt
+            return _load_prompt(prompt_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found at: {prompt_path}")
         except Exception as e:
@@ -159,7 +415,7 @@ class DataAnalyzer:
             json_content = self._extract_json_from_response(analysis_result)
             
             # Parse JSON response
-            parsed_data = json.loads(json_content)
+            parsed_data = orjson.loads(json_content)
             
             # Convert and validate data
             project_data = self._convert_to_project_data(parsed_data)
@@ -169,12 +425,16 @@ class DataAnalyzer:
             
             return project_data
             
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+            # Do not keep serving a response that cannot be used
+            self.groq_client.discard(text_content, prompt)
             logger.error(f"Failed to parse JSON: {e}")
             logger.error(f"Cleaned JSON content: {json_content}")
             logger.error(f"Raw response: {analysis_result}")
             raise
         except Exception as e:
+            # Valid JSON can still fail conversion (e.g. missing project_info); drop that response too
+            self.groq_client.discard(text_content, prompt)
             logger.error(f"Analysis failed: {e}")
             raise
     
@@ -215,126 +475,183 @@ class DataAnalyzer:
     def _clean_json_expressions(self, json_content: str) -> str:
         """Clean JSON content by evaluating mathematical expressions"""
         
-        import re
-        
-        # Find and replace mathematical expressions in JSON values
-        pattern = r'"([^"]+)":\s*(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)'
-        
-        def evaluate_expression(match):
-            field_name = match.group(1)
-            num1 = float(match.group(2))
-            operator = match.group(3)
-            num2 = float(match.group(4))
-            
-            if operator == '+':
-                result = num1 + num2
-            elif operator == '-':
-                result = num1 - num2
-            elif operator == '*':
-                result = num1 * num2
-            elif operator == '/':
-                result = num1 / num2 if num2 != 0 else 0
-            else:
-                result = num1
-            
-            logger.info(f"Evaluated expression: {num1} {operator} {num2} = {result}")
-            return f'"{field_name}": {result}'
-        
-        # Replace all mathematical expressions
-        cleaned_content = re.sub(pattern, evaluate_expression, json_content)
-        
-        # Also handle expressions in parentheses
-        parentheses_pattern = r'"([^"]+)":\s*\((\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)\)\s*([+\-*/])\s*(\d+(?:\.\d+)?)'
-        
-        def evaluate_parentheses_expression(match):
-            field_name = match.group(1)
-            num1 = float(match.group(2))
-            op1 = match.group(3)
-            num2 = float(match.group(4))
-            op2 = match.group(5)
-            num3 = float(match.group(6))
+        # Most responses are plain JSON: without an operator there is nothing to evaluate
+        if ('+' not in json_content and '*' not in json_content and '/' not in json_content
+                and not _SUBTRACTION_RE.search(json_content)):
+            return json_content
+        
+        # Single left-to-right scan. Only a '"key":' can start an expression, so the scan jumps
+        # from one '":' to the next and parses the value after it by hand:
+        #   "key": a op b          -> "key": result
+        #   "key": (a op b) op c   -> "key": result
+        output = []
+        copied_up_to = 0
+        length = len(json_content)
+        colon = json_content.find('":')
+        
+        while colon != -1:
+            value_start = colon + 2
+            while value_start < length and json_content[value_start].isspace():
+                value_start += 1
+            first = json_content[value_start:value_start + 1]
+            match_end = -1
             
-            # Calculate expression in parentheses first
-            if op1 == '+':
-                intermediate = num1 + num2
-            elif op1 == '-':
-                intermediate = num1 - num2
-            elif op1 == '*':
-                intermediate = num1 * num2
-            elif op1 == '/':
-                intermediate = num1 / num2 if num2 != 0 else 0
-            else:
-                intermediate = num1
+            # Most values are strings or plain numbers, so look at the first character before anything else.
+            # An expression holds no comma, so a value with no operator before the next comma is a plain number.
+            if first == '(' or first.isdecimal():
+                value_end = json_content.find(',', value_start)
+                head = json_content[value_start:value_end] if value_end != -1 else json_content[value_start:]
+                if '+' in head or '-' in head or '*' in head or '/' in head:
+                    # The key runs from the previous quote; it must be non-empty and not already rewritten
+                    key_start = json_content.rfind('"', 0, colon)
+                    if copied_up_to <= key_start < colon - 1:
+                        if first == '(':
+                            match_end, result = self._evaluate_parentheses_expression(json_content, value_start)
+                        else:
+                            match_end, result = self._evaluate_expression(json_content, value_start)
             
-            # Apply second operation
-            if op2 == '+':
-                result = intermediate + num3
-            elif op2 == '-':
-                result = intermediate - num3
-            elif op2 == '*':
-                result = intermediate * num3
-            elif op2 == '/':
-                result = intermediate / num3 if num3 != 0 else 0
-            else:
-                result = intermediate
+            if match_end == -1:
+                colon = json_content.find('":', colon + 1)
+                continue
             
-            logger.info(f"Evaluated complex expression: ({num1} {op1} {num2}) {op2} {num3} = {result}")
-            return f'"{field_name}": {result}'
-        
-        # Replace complex expressions
-        cleaned_content = re.sub(parentheses_pattern, evaluate_parentheses_expression, cleaned_content)
-        
-        return cleaned_content
+            output.append(json_content[copied_up_to:key_start])
+            output.append(f'"{json_content[key_start + 1:colon]}": {result}')
+            copied_up_to = match_end
+            colon = json_content.find('":', match_end)
+        
+        if not output:
+            return json_content
+        output.append(json_content[copied_up_to:])
+        return "".join(output)
+    
+    @staticmethod
+    def _evaluate_expression(text: str, pos: int):
+        """Evaluate `a op b` starting at pos; returns (end, result), or (-1, None) if there is no expression"""
+        
+        num1_end = _scan_number(text, pos)
+        if num1_end == -1:
+            return -1, None
+        operator_pos = _skip_whitespace(text, num1_end)
+        if operator_pos >= len(text) or text[operator_pos] not in _EXPRESSION_OPERATORS:
+            return -1, None
+        num2_start = _skip_whitespace(text, operator_pos + 1)
+        num2_end = _scan_number(text, num2_start)
+        if num2_end == -1:
+            return -1, None
+        
+        num1 = float(text[pos:num1_end])
+        operator = text[operator_pos]
+        num2 = float(text[num2_start:num2_end])
+        result = _EXPRESSION_OPERATORS[operator](num1, num2)
+        
+        logger.info("Evaluated expression: %s %s %s = %s", num1, operator, num2, result)
+        return num2_end, result
+    
+    @staticmethod
+    def _evaluate_parentheses_expression(text: str, pos: int):
+        """Evaluate `(a op b) op c` starting at the '(' at pos; returns (end, result), or (-1, None)"""
+        
+        length = len(text)
+        num1_end = _scan_number(text, pos + 1)
+        if num1_end == -1:
+            return -1, None
+        op1_pos = _skip_whitespace(text, num1_end)
+        if op1_pos >= length or text[op1_pos] not in _EXPRESSION_OPERATORS:
+            return -1, None
+        num2_start = _skip_whitespace(text, op1_pos + 1)
+        num2_end = _scan_number(text, num2_start)
+        if num2_end == -1 or num2_end >= length or text[num2_end] != ')':
+            return -1, None
+        op2_pos = _skip_whitespace(text, num2_end + 1)
+        if op2_pos >= length or text[op2_pos] not in _EXPRESSION_OPERATORS:
+            return -1, None
+        num3_start = _skip_whitespace(text, op2_pos + 1)
+        num3_end = _scan_number(text, num3_start)
+        if num3_end == -1:
+            return -1, None
+        
+        num1 = float(text[pos + 1:num1_end])
+        op1 = text[op1_pos]
+        num2 = float(text[num2_start:num2_end])
+        op2 = text[op2_pos]
+        num3 = float(text[num3_start:num3_end])
+        
+        # Calculate expression in parentheses first, then apply second operation
+        intermediate = _EXPRESSION_OPERATORS[op1](num1, num2)
+        result = _EXPRESSION_OPERATORS[op2](intermediate, num3)
+        
+        logger.info("Evaluated complex expression: (%s %s %s) %s %s = %s", num1, op1, num2, op2, num3, result)
+        return num3_end, result
     
     def _post_process_data(self, project_data: ProjectData) -> ProjectData:
         """Post-process data to fix common extraction errors and perform correct calculations"""
         
         logger.info("Post-processing data for accuracy with correct form calculations...")
         
-        for position in project_data.job_positions:
+        positions = project_data.job_positions
+        if positions:
+            count = len(positions)
+            
+            def column(field, dtype=np.float64):
+                return np.fromiter((getattr(p, field) for p in positions), dtype=dtype, count=count)
+            
             # Fix working week length (common error: 40 instead of 5)
-            if position.working_week_length == 40:
-                position.working_week_length = 5
-                logger.info(f"Fixed working week for {position.position_function}: 40 → 5")
+            working_weeks = column('working_week_length', np.int64)
+            week_fixed = working_weeks == 40
+            working_weeks[week_fixed] = 5
             
             # Recalculate annual leave rate using reference table
-            correct_rate = self.leave_calculator.get_leave_rate(
-                position.working_week_length, 
-                position.annual_leave_days
-            )
-            if abs(position.annual_leave_rate - correct_rate) > 0.001:
-                logger.info(f"Fixed leave rate for {position.position_function}: {position.annual_leave_rate} → {correct_rate}")
-                position.annual_leave_rate = correct_rate
+            correct_rates = self.leave_calculator.get_leave_rates(working_weeks, column('annual_leave_days', np.int64))
+            rate_fixed = np.abs(column('annual_leave_rate') - correct_rates) > 0.001
             
-            # Correct calculation: Column 13 = Column 10 + Column 12
-            correct_total_excluding = position.planned_salary_rate + position.increase_amount
-            if abs(position.total_excluding_contribution - correct_total_excluding) > 0.01:
-                logger.info(f"Fixed total excluding contribution for {position.position_function}: {position.total_excluding_contribution} → {correct_total_excluding}")
-                position.total_excluding_contribution = correct_total_excluding
+            # Each step below builds on the (possibly corrected) column before it, as the form does
+            def correct(field, expected):
+                current = column(field)
+                fixed = np.abs(current - expected) > 0.01
+                return np.where(fixed, expected, current), fixed
             
+            # Column 13 = Column 10 + Column 12 is already set from those inputs by _convert_to_project_data
+            total_excluding = column('total_excluding_contribution')
             # Column 14: Total including employer contribution
-            contribution_multiplier = 1 + project_data.contribution_rate
-            correct_total_including = position.total_excluding_contribution * contribution_multiplier
-            if abs(position.total_including_contribution - correct_total_including) > 0.01:
-                logger.info(f"Fixed total including contribution for {position.position_function}: {position.total_including_contribution} → {correct_total_including}")
-                position.total_including_contribution = correct_total_including
-            
+            total_including, including_fixed = correct(
+                'total_including_contribution', total_excluding * (1 + project_data.contribution_rate)
+            )
             # Column 19: Total R&D fee = Column 14 + Column 18
-            correct_rd_fee = position.total_including_contribution + position.annual_leave_cost
-            if abs(position.total_rd_fee - correct_rd_fee) > 0.01:
-                logger.info(f"Fixed total R&D fee for {position.position_function}: {position.total_rd_fee} → {correct_rd_fee}")
-                position.total_rd_fee = correct_rd_fee
-            
+            total_rd_fee, rd_fee_fixed = correct('total_rd_fee', total_including + column('annual_leave_cost'))
             # Column 20: Total planned remuneration = Column 19 + Column 9
-            correct_total_remuneration = position.total_rd_fee + position.months_hours_planned
-            if abs(position.total_planned_remuneration - correct_total_remuneration) > 0.01:
-                logger.info(f"Fixed total planned remuneration for {position.position_function}: {position.total_planned_remuneration} → {correct_total_remuneration}")
-                position.total_planned_remuneration = correct_total_remuneration
+            total_remuneration, remuneration_fixed = correct(
+                'total_planned_remuneration', total_rd_fee + column('months_hours_planned')
+            )
+            
+            # Write back only the positions that needed a correction
+            fixes = (
+                ('annual_leave_rate', rate_fixed, correct_rates),
+                ('total_including_contribution', including_fixed, total_including),
+                ('total_rd_fee', rd_fee_fixed, total_rd_fee),
+                ('total_planned_remuneration', remuneration_fixed, total_remuneration),
+            )
+            log_fixes = logger.isEnabledFor(logging.DEBUG)
+            fixed_fields = int(week_fixed.sum())
+            for idx in np.flatnonzero(week_fixed):
+                positions[idx].working_week_length = 5
+                if log_fixes:
+                    logger.debug("Fixed working week for %s: 40 → 5", positions[idx].position_function)
+            for field, fixed, values in fixes:
+                fixed_fields += int(fixed.sum())
+                for idx in np.flatnonzero(fixed):
+                    position = positions[idx]
+                    value = float(values[idx])
+                    if log_fixes:
+                        logger.debug("Fixed %s for %s: %s → %s", field, position.position_function, getattr(position, field), value)
+                    setattr(position, field, value)
+            
+            logger.info("Corrected %d fields across %d positions", fixed_fields, count)
         
         # Set correct contribution rate based on organization type
-        if "budgetary" in project_data.budgetary_classification.lower():
+        classification = project_data.budgetary_classification.lower()
+        if "budgetary" in classification:
             project_data.contribution_rate = 0.014
-        elif "business" in project_data.budgetary_classification.lower():
+        elif "business" in classification:
             project_data.contribution_rate = 0.046
         
         logger.info("Post-processing completed with correct form calculations")
@@ -349,47 +666,40 @@ class DataAnalyzer:
             
             job_positions = []
             for idx, pos_data in enumerate(positions_data):
-
-
+                fields = _coerce_fields(pos_data, _POSITION_TEXT_FIELDS, _POSITION_NUMBER_FIELDS)
+                default_eil_no, default_impact_no, default_action_no = (
+                    _POSITION_NUMBERS[idx] if idx < len(_POSITION_NUMBERS) else _position_numbers(idx)
+                )
+                fields["eil_no"] = pos_data.get("eil_no", default_eil_no)
+                
                 # Generate missing fields with intelligent defaults
-                project_impact_no = pos_data.get("project_impact_no", f"1.{idx+2}")
+                project_impact_no = pos_data.get("project_impact_no", default_impact_no)
                 if not project_impact_no or project_impact_no.strip() == "" or project_impact_no == "1.2":
-                    project_impact_no = f"1.{idx+2}"  # Sequential: 1.2, 1.3, 1.4, 1.5, etc.
+                    project_impact_no = default_impact_no  # Sequential: 1.2, 1.3, 1.4, 1.5, etc.
+                fields["project_impact_no"] = project_impact_no
                 
-                action_expenditure_no = pos_data.get("action_expenditure_no", f"1.{idx+2}.1")
+                action_expenditure_no = pos_data.get("action_expenditure_no", default_action_no)
                 if not action_expenditure_no or action_expenditure_no.strip() == "" or action_expenditure_no == "1.2.1":
-                    action_expenditure_no = f"1.{idx+2}.1"  # Sequential: 1.2.1, 1.3.1, 1.4.1, etc.
+                    action_expenditure_no = default_action_no  # Sequential: 1.2.1, 1.3.1, 1.4.1, etc.
+                fields["action_expenditure_no"] = action_expenditure_no
                 
-
                 # Intelligent contract type detection
                 employment_contract_type = pos_data.get("employment_contract_type", "time-limited")
                 if not employment_contract_type or employment_contract_type.strip() == "":
-                    # Analyze job context for contract type
-                    duties_in_orp = pos_data.get("duties_in_orp", "").lower()
-                    months_hours_planned = int(pos_data.get("months_hours_planned", 12))
-                    
-                    # If coordinator for full project duration, likely indefinite
-                    # If duration is full project length (36 months), could be indefinite
-                    if "coordinator" in duties_in_orp and months_hours_planned >= 36:
-                        employment_contract_type = "indefinite"
-                    elif months_hours_planned >= 36:
+                    # A position planned for the full project length (36 months or more), coordinator or not,
+                    # is likely indefinite
+                    if fields["months_hours_planned"] >= 36:
                         employment_contract_type = "indefinite"
                     else:
                         employment_contract_type = "time-limited"
-
-
-
-                # Handle calculated fields
-                increase_amount = float(pos_data.get("increase_amount", 0))
-                planned_salary_rate = float(pos_data.get("planned_salary_rate", 0))
+                fields["employment_contract_type"] = employment_contract_type
                 
                 # Calculate total excluding contribution (Column 13 = Column 10 + Column 12)
-                total_excluding_contribution = planned_salary_rate + increase_amount
+                fields["total_excluding_contribution"] = fields["planned_salary_rate"] + fields["increase_amount"]
                 
-                # Generate missing fields with intelligent defaults
+                # Leave employee name empty unless given, as per form requirement
                 employee_name = pos_data.get("employee_name", "")
-                if not employee_name or employee_name.strip() == "":
-                    employee_name = ""  # Leave empty as per form requirement
+                fields["employee_name"] = employee_name if employee_name and employee_name.strip() else ""
                 
                 # Enhanced justification
                 justification_parts = []
@@ -406,7 +716,7 @@ class DataAnalyzer:
                     justification_parts.append(f"Bonus structure: {bonus_breakdown}")
                 
                 if not justification_parts:
-                    position_function = pos_data.get("position_function", "")
+                    position_function = fields["position_function"]
                     if "Research" in position_function:
                         justification_parts.append("Research position requiring specialized expertise and qualifications")
                     elif "Coordinator" in position_function or "Manager" in position_function:
@@ -414,46 +724,14 @@ class DataAnalyzer:
                     else:
                         justification_parts.append("Position requiring appropriate qualifications and experience")
                 
-                full_justification = ". ".join(justification_parts)
+                fields["justification"] = ". ".join(justification_parts)
+                fields["coefficient"] = coefficient
+                fields["bonus_breakdown"] = bonus_breakdown
                 
-
-
-
-
-                position = JobPosition(
-                    eil_no=pos_data.get("eil_no", str(idx+1)),
-                    project_impact_no=project_impact_no,
-                    action_expenditure_no=action_expenditure_no,
-                    duties_in_orp=pos_data.get("duties_in_orp", "Project-related duties"),
-                    position_function=pos_data.get("position_function", "Unknown Position"),
-                    employee_name=employee_name,
-                    employment_contract_type=employment_contract_type,
-                    remuneration_year=pos_data.get("remuneration_year", "2024"),
-                    months_hours_planned=int(pos_data.get("months_hours_planned", 12)),
-                    planned_salary_rate=planned_salary_rate,
-                    increase_percentage=float(pos_data.get("increase_percentage", 0)),
-                    increase_amount=increase_amount,
-                    total_excluding_contribution=total_excluding_contribution,
-                    total_including_contribution=float(pos_data.get("total_including_contribution", 0)),
-                    working_week_length=int(pos_data.get("working_week_length", 5)),
-                    annual_leave_days=int(pos_data.get("annual_leave_days", 20)),
-                    annual_leave_rate=float(pos_data.get("annual_leave_rate", 0.0863)),
-                    annual_leave_cost=float(pos_data.get("annual_leave_cost", 0)),
-                    total_rd_fee=float(pos_data.get("total_rd_fee", 0)),
-                    total_planned_remuneration=float(pos_data.get("total_planned_remuneration", 0)),
-                    justification=full_justification,
-                    coefficient=coefficient,
-                    bonus_breakdown=bonus_breakdown
-                )
-                job_positions.append(position)
+                job_positions.append(JobPosition(**fields))
             
             project_data = ProjectData(
-                project_code=project_info.get("project_code", ""),
-                organization_name=project_info.get("organization_name", ""),
-                project_duration_months=int(project_info.get("project_duration_months", 0)),
-                contribution_rate=float(project_info.get("contribution_rate", 0.014)),
-                organization_type=project_info.get("organization_type", ""),
-                budgetary_classification=project_info.get("budgetary_classification", "budgetary"),
+                **_coerce_fields(project_info, _PROJECT_TEXT_FIELDS, _PROJECT_NUMBER_FIELDS),
                 job_positions=job_positions
             )
             
@@ -465,52 +743,55 @@ class DataAnalyzer:
             logger.error(f"Parsed data structure: {parsed_data}")
             raise
 
+# Position columns of the form in order (B=2 to V=22), as (JobPosition field, column index)
+_COL_LAYOUT = (
+    ('eil_no', 2),                          # B - Column 1
+    ('project_impact_no', 3),               # C - Column 2
+    ('action_expenditure_no', 4),           # D - Column 3
+    ('duties_in_orp', 5),                   # E - Column 4
+    ('position_function', 6),               # F - Column 5
+    ('employee_name', 7),                   # G - Column 6
+    ('employment_contract_type', 8),        # H - Column 7
+    ('remuneration_year', 9),               # I - Column 8
+    ('months_hours_planned', 10),           # J - Column 9
+    ('planned_salary_rate', 11),            # K - Column 10
+    ('increase_percentage', 12),            # L - Column 11
+    ('increase_amount', 13),                # M - Column 12
+    ('total_excluding_contribution', 14),   # N - Column 13
+    ('total_including_contribution', 15),   # O - Column 14
+    ('working_week_length', 16),            # P - Column 15
+    ('annual_leave_days', 17),              # Q - Column 16
+    ('annual_leave_rate', 18),              # R - Column 17
+    ('annual_leave_cost', 19),              # S - Column 18
+    ('total_rd_fee', 20),                   # T - Column 19
+    ('total_planned_remuneration', 21),     # U - Column 20
+    ('justification', 22),                  # V - Column 21
+)
+# Fields written from calculate_form_fields rather than from the extracted position, in _remuneration_kernel order
+_CALCULATED_FIELDS = ('total_excluding_contribution', 'total_including_contribution', 'annual_leave_cost',
+                      'total_rd_fee', 'total_planned_remuneration')
+_POSITION_COLUMNS = tuple((field, column) for field, column in _COL_LAYOUT
+                          if field not in _CALCULATED_FIELDS and field != 'justification')
+_CALCULATED_COLUMNS = tuple((field, dict(_COL_LAYOUT)[field]) for field in _CALCULATED_FIELDS)
+# Column of each value in a written row: the position fields, then the calculated fields, then the justification
+_ROW_COLUMNS = (tuple(column for _, column in _POSITION_COLUMNS) + tuple(column for _, column in _CALCULATED_COLUMNS)
+                + (dict(_COL_LAYOUT)['justification'],))
+_position_values = operator.attrgetter(*(field for field, _ in _POSITION_COLUMNS))
+
 class ExcelFormFiller:
     """Excel form filler with correct column mapping B to V"""
     
     def __init__(self):
-        # Corrected column mapping based on the exact form structure (B=2 to V=22)
-        self.column_mapping = {
-            'eil_no': 2,                           # B - Column 1
-            'project_impact_no': 3,                # C - Column 2  
-            'action_expenditure_no': 4,            # D - Column 3
-            'duties_in_orp': 5,                    # E - Column 4
-            'position_function': 6,                # F - Column 5
-            'employee_name': 7,                    # G - Column 6
-            'employment_contract_type': 8,         # H - Column 7
-            'remuneration_year': 9,                # I - Column 8
-            'months_hours_planned': 10,            # J - Column 9
-            'planned_salary_rate': 11,             # K - Column 10
-            'increase_percentage': 12,             # L - Column 11
-            'increase_amount': 13,                 # M - Column 12
-            'total_excluding_contribution': 14,    # N - Column 13
-            'total_including_contribution': 15,    # O - Column 14
-            'working_week_length': 16,             # P - Column 15
-            'annual_leave_days': 17,               # Q - Column 16
-            'annual_leave_rate': 18,               # R - Column 17
-            'annual_leave_cost': 19,               # S - Column 18
-            'total_rd_fee': 20,                    # T - Column 19
-            'total_planned_remuneration': 21,      # U - Column 20
-            'justification': 22                    # V - Column 21
-        }
+        # Corrected column mapping based on the exact form structure (B=2 to V=22), by field name
+        self.column_mapping = dict(_COL_LAYOUT)
     
     def calculate_form_fields(self, position: JobPosition, contribution_rate: float) -> Dict[str, float]:
         """Calculate all form fields according to the exact form requirements"""
         
-        # Column 13 (N): Total excluding employer contribution = Column 10 + Column 12
-        total_excluding_contribution = position.planned_salary_rate + position.increase_amount
-        
-        # Column 14 (O): Total including employer contribution  
-        total_including_contribution = total_excluding_contribution * (1 + contribution_rate)
-        
-        # Column 18 (S): Annual leave cost calculation
-        annual_leave_cost = total_including_contribution * position.annual_leave_rate * position.months_hours_planned
-        
-        # Column 19 (T): Total R&D fee = Column 14 + Column 18
-        total_rd_fee = total_including_contribution + annual_leave_cost
-        
-        # Column 20 (U): Total planned remuneration = Column 19 + Column 9
-        total_planned_remuneration = total_rd_fee + position.months_hours_planned
+        (total_excluding_contribution, total_including_contribution, annual_leave_cost,
+         total_rd_fee, total_planned_remuneration) = _remuneration_kernel(
+            position.planned_salary_rate, position.increase_amount, contribution_rate,
+            position.annual_leave_rate, position.months_hours_planned)
         
         return {
             'total_excluding_contribution': round(total_excluding_contribution, 2),
@@ -520,23 +801,40 @@ class ExcelFormFiller:
             'total_planned_remuneration': round(total_planned_remuneration, 2)
         }
     
-    def fill_project_header_info(self, sheet, project_data: ProjectData):
-        """Fill project header information"""
+    def calculate_form_columns(self, positions: List[JobPosition], contribution_rate: float) -> Dict[str, np.ndarray]:
+        """Same formulas as calculate_form_fields over arrays of all positions, unrounded"""
         
-        # Project information (adjust row numbers as needed)
-        sheet['B4'] = "Project/Joint project code"
-        sheet['I4'] = project_data.project_code
+        count = len(positions)
+        salaries = np.fromiter((p.planned_salary_rate for p in positions), dtype=np.float64, count=count)
+        increases = np.fromiter((p.increase_amount for p in positions), dtype=np.float64, count=count)
+        leave_rates = np.fromiter((p.annual_leave_rate for p in positions), dtype=np.float64, count=count)
+        months = np.fromiter((p.months_hours_planned for p in positions), dtype=np.float64, count=count)
         
-        sheet['B5'] = "Name of the applicant/joint applicant/project partner"
-        sheet['I5'] = project_data.organization_name
-        
-        sheet['B6'] = "Project duration, months"
-        sheet['I6'] = project_data.project_duration_months
+        return dict(zip(_CALCULATED_FIELDS, _remuneration_kernel(salaries, increases, contribution_rate, leave_rates, months)))
+    
+    def calculate_form_rows(self, positions: List[JobPosition], contribution_rate: float) -> List[Tuple[float, ...]]:
+        """Rounded calculated values per position, as tuples in _CALCULATED_FIELDS order"""
+        columns = self.calculate_form_columns(positions, contribution_rate)
+        return list(zip(*(_round_cents(columns[name]) for name in _CALCULATED_FIELDS)))
+    
+    def fill_project_header_info(self, sheet, project_data: ProjectData):
+        """Fill project header information"""
         
-        sheet['B9'] = "Type of organization"
-        sheet['H9'] = project_data.organization_type
-        sheet['I9'] = "Budgetary" if "budgetary" in project_data.budgetary_classification.lower() else "Non-budgetary"
-        sheet['J9'] = f"{project_data.contribution_rate:.3f}"
+        # Project information (adjust row numbers as needed), addressed by (row, column) to skip parsing 'B4'-style keys
+        header_cells = (
+            (4, 2, "Project/Joint project code"),                              # B4
+            (4, 9, project_data.project_code),                                 # I4
+            (5, 2, "Name of the applicant/joint applicant/project partner"),   # B5
+            (5, 9, project_data.organization_name),                            # I5
+            (6, 2, "Project duration, months"),                                # B6
+            (6, 9, project_data.project_duration_months),                      # I6
+            (9, 2, "Type of organization"),                                    # B9
+            (9, 8, project_data.organization_type),                            # H9
+            (9, 9, "Budgetary" if "budgetary" in project_data.budgetary_classification.lower() else "Non-budgetary"),  # I9
+            (9, 10, f"{project_data.contribution_rate:.3f}"),                  # J9
+        )
+        for row, column, value in header_cells:
+            sheet.cell(row=row, column=column).value = value
         
         logger.info("Project header information filled")
     
@@ -578,33 +876,32 @@ class ExcelFormFiller:
         end_row = start_row + num_positions - 1  # e.g., if 10 positions: 15 to 24
         sum_row = 33  # Sum formulas go to row 33
         
-        # Define dynamic sum formulas with correct column mapping
-        sum_formulas = {
-            f'J{sum_row}': f'=SUM(J{start_row}:J{end_row})',  # Number of months/hours planned
-            f'K{sum_row}': f'=SUM(K{start_row}:K{end_row})',  # Planned post salary/hourly rate, EUR
-            f'L{sum_row}': f'=SUM(L{start_row}:L{end_row})',  # Increase, % (if applicable)
-            f'M{sum_row}': f'=SUM(M{start_row}:M{end_row})',  # Amount of increase, EUR (if applicable)
-            f'N{sum_row}': f'=SUM(N{start_row}:N{end_row})',  # Total planned remuneration excluding employer's contribution, EUR
-            f'O{sum_row}': f'=SUM(O{start_row}:O{end_row})',  # Total rate of pay for the planned salary including employer's contribution, EUR
-            f'S{sum_row}': f'=SUM(S{start_row}:S{end_row})',  # Planned cost of annual leave (including employer's contributions), EUR
-            f'T{sum_row}': f'=SUM(T{start_row}:T{end_row})',  # Total planned R&D fee, EUR
-            f'U{sum_row}': f'=SUM(U{start_row}:U{end_row})',  # Total planned remuneration, EUR
-        }
-        
-        # Insert the formulas into the sheet
-        for cell_address, formula in sum_formulas.items():
-            sheet[cell_address] = formula
-            logger.info(f"Added dynamic formula to {cell_address}: {formula}")
+        # Insert the formulas into the sheet by (row, column), skipping the 'J33' coordinate parse
+        for letter, column in _SUM_COLUMNS:
+            formula = '=SUM(%s%d:%s%d)' % (letter, start_row, letter, end_row)
+            sheet.cell(row=sum_row, column=column, value=formula)
+            logger.info("Added dynamic formula to %s%d: %s", letter, sum_row, formula)
         
-        logger.info(f"All sum formulas added to row {sum_row} for {num_positions} positions (rows {start_row}-{end_row})")
+        logger.info("All sum formulas added to row %d for %d positions (rows %d-%d)", sum_row, num_positions, start_row, end_row)
 
 
-    def fill_excel_form(self, template_path: str, output_path: str, project_data: ProjectData) -> bool:
-        """Fill Excel form with correct calculations and mapping"""
+    def open_template(self, template_path: str):
+        """Load the template workbook, ready to be filled"""
+        
+        # The form is filled in place, so read_only/write_only would lose the template's layout and formulas;
+        # VBA, external links and rich text are never used by this form, so skip parsing them instead
+        return openpyxl.load_workbook(
+            template_path, read_only=False, keep_vba=False, data_only=False, keep_links=False, rich_text=False
+        )
+    
+    def fill_excel_form(self, template_path: str, output_path: str, project_data: ProjectData,
+                        calculated_rows: Optional[List[Tuple[float, ...]]] = None) -> bool:
+        """Fill Excel form with correct calculations and mapping; calculated_rows from calculate_form_rows
+        may be passed in if already available"""
         
         try:
             logger.info(f"Loading Excel template: {template_path}")
-            workbook = openpyxl.load_workbook(template_path)
+            workbook = self.open_template(template_path)
             
             # Try to find the correct sheet
             sheet_name = "Other (non-budgetary) "
@@ -623,34 +920,22 @@ class ExcelFormFiller:
             start_row = 15  # Adjust based on actual form structure
             total_project_cost = 0
             
-            for idx, position in enumerate(project_data.job_positions):
+            # The classification is the same for every position, so check it once
+            is_budgetary = "budgetary" in project_data.budgetary_classification.lower()
+            log_positions = logger.isEnabledFor(logging.INFO)
+            
+            # Calculate all derived fields correctly according to form requirements, for all positions at once
+            if calculated_rows is None:
+                calculated_rows = self.calculate_form_rows(project_data.job_positions, project_data.contribution_rate)
+            
+            # Loop invariant bound once; the column indexes are module constants (_ROW_COLUMNS)
+            write_cell = sheet.cell
+            
+            for idx, (position, calculated) in enumerate(zip(project_data.job_positions, calculated_rows)):
                 row = start_row + idx
-                
-                # Calculate all derived fields correctly according to form requirements
-                calculated = self.calculate_form_fields(position, project_data.contribution_rate)
-                total_project_cost += calculated['total_planned_remuneration']
-                
-                # Fill all position data according to correct column mapping
-                sheet.cell(row=row, column=self.column_mapping['eil_no']).value = position.eil_no
-                sheet.cell(row=row, column=self.column_mapping['project_impact_no']).value = position.project_impact_no
-                sheet.cell(row=row, column=self.column_mapping['action_expenditure_no']).value = position.action_expenditure_no
-                sheet.cell(row=row, column=self.column_mapping['duties_in_orp']).value = position.duties_in_orp
-                sheet.cell(row=row, column=self.column_mapping['position_function']).value = position.position_function
-                sheet.cell(row=row, column=self.column_mapping['employee_name']).value = position.employee_name
-                sheet.cell(row=row, column=self.column_mapping['employment_contract_type']).value = position.employment_contract_type
-                sheet.cell(row=row, column=self.column_mapping['remuneration_year']).value = position.remuneration_year
-                sheet.cell(row=row, column=self.column_mapping['months_hours_planned']).value = position.months_hours_planned
-                sheet.cell(row=row, column=self.column_mapping['planned_salary_rate']).value = position.planned_salary_rate
-                sheet.cell(row=row, column=self.column_mapping['increase_percentage']).value = position.increase_percentage
-                sheet.cell(row=row, column=self.column_mapping['increase_amount']).value = position.increase_amount
-                sheet.cell(row=row, column=self.column_mapping['total_excluding_contribution']).value = calculated['total_excluding_contribution']
-                sheet.cell(row=row, column=self.column_mapping['total_including_contribution']).value = calculated['total_including_contribution']
-                sheet.cell(row=row, column=self.column_mapping['working_week_length']).value = position.working_week_length
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_days']).value = position.annual_leave_days
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_rate']).value = position.annual_leave_rate
-                sheet.cell(row=row, column=self.column_mapping['annual_leave_cost']).value = calculated['annual_leave_cost']
-                sheet.cell(row=row, column=self.column_mapping['total_rd_fee']).value = calculated['total_rd_fee']
-                sheet.cell(row=row, column=self.column_mapping['total_planned_remuneration']).value = calculated['total_planned_remuneration']
+                total_excluding_contribution = calculated[0]
+                total_planned_remuneration = calculated[-1]
+                total_project_cost += total_planned_remuneration
                 
                 # Enhanced justification with all relevant information
                 justification_parts = []
@@ -667,18 +952,22 @@ class ExcelFormFiller:
                 salary_calculation = f"Planned rate calculation: Base salary €{position.planned_salary_rate}"
                 if position.increase_amount > 0:
                     salary_calculation += f" + Increase €{position.increase_amount} ({position.increase_percentage*100:.1f}%)"
-                salary_calculation += f" = Total €{calculated['total_excluding_contribution']}"
+                salary_calculation += f" = Total €{total_excluding_contribution}"
                 justification_parts.append(salary_calculation)
                 
                 # Add compliance information for budgetary institutions
-                if "budgetary" in project_data.budgetary_classification.lower():
+                if is_budgetary:
                     justification_parts.append("Compliant with Lithuanian civil service regulations")
                 
                 full_justification = " | ".join(justification_parts) if justification_parts else position.justification
                 
-                sheet.cell(row=row, column=self.column_mapping['justification']).value = full_justification
+                # Fill all position data according to correct column mapping, one pass over the row
+                row_values = _position_values(position) + calculated + (full_justification,)
+                for column, value in zip(_ROW_COLUMNS, row_values):
+                    write_cell(row=row, column=column, value=value)
                 
-                logger.info(f"[OK] Filled position {idx + 1}: {position.position_function} - €{calculated['total_planned_remuneration']:,.2f}")
+                if log_positions:
+                    logger.info(f"[OK] Filled position {idx + 1}: {position.position_function} - €{total_planned_remuneration:,.2f}")
             
             # Add DYNAMIC sum formulas based on actual number of positions to ROW 33 - NEW CODE
             logger.info(f"Adding dynamic sum formulas to row 33 for {num_positions} positions...")
@@ -732,8 +1021,11 @@ class ExcelFormFiller:
 class ProjectAnalyzer:
     """Main orchestrator with correct form handling"""
     
-    def __init__(self, groq_api_key: str):
-        self.groq_client = GroqAPIClient(groq_api_key)
+    def __init__(self, groq_api_key: str, cache_dir: Optional[str] = None):
+        # DISABLE_GROQ_CACHE=1 turns the on-disk response cache off
+        if os.environ.get("DISABLE_GROQ_CACHE", "").lower() in ("1", "true", "yes"):
+            cache_dir = None
+        self.groq_client = GroqAPIClient(groq_api_key, cache_dir)
         self.data_analyzer = DataAnalyzer(self.groq_client)
         self.excel_filler = ExcelFormFiller()
     
@@ -776,13 +1068,17 @@ class ProjectAnalyzer:
             
             # Step 3: Generate statistics
             logger.info("[STEP] STEP 3: Generating Statistics")
-            statistics = self._generate_statistics(project_data)
+            # Form fields are calculated once and shared by the statistics and the Excel fill
+            calculated_rows = self.excel_filler.calculate_form_rows(
+                project_data.job_positions, project_data.contribution_rate
+            )
+            statistics = self._generate_statistics(project_data, calculated_rows)
             results['statistics'] = statistics
             results['steps_completed'].append('statistics_generated')
             
             # Step 4: Fill Excel with correct mapping
             logger.info("[STEP] STEP 4: Filling Excel Form with Correct Mapping")
-            excel_success = self.excel_filler.fill_excel_form(template_path, output_path, project_data)
+            excel_success = self.excel_filler.fill_excel_form(template_path, output_path, project_data, calculated_rows)
             
             if excel_success:
                 results['steps_completed'].append('excel_filled')
@@ -798,7 +1094,8 @@ class ProjectAnalyzer:
         
         return results
     
-    def _generate_statistics(self, project_data: ProjectData) -> Dict[str, Any]:
+    def _generate_statistics(self, project_data: ProjectData,
+                             calculated_rows: Optional[List[Tuple[float, ...]]] = None) -> Dict[str, Any]:
         """Generate statistics with correct form calculations"""
         
         total_positions = len(project_data.job_positions)
@@ -813,10 +1110,13 @@ class ProjectAnalyzer:
         position_summary = []
         validation_issues = []
         
-        for position in project_data.job_positions:
-            calculated = self.excel_filler.calculate_form_fields(position, project_data.contribution_rate)
-            
-            position_cost = calculated['total_planned_remuneration']
+        if calculated_rows is None:
+            calculated_rows = self.excel_filler.calculate_form_rows(
+                project_data.job_positions, project_data.contribution_rate
+            )
+        
+        for position, calculated in zip(project_data.job_positions, calculated_rows):
+            position_cost = calculated[-1]  # total_planned_remuneration
             total_project_cost += position_cost
             total_base_salaries += position.planned_salary_rate * position.months_hours_planned
             total_increases += position.increase_amount * position.months_hours_planned
@@ -830,7 +1130,7 @@ class ProjectAnalyzer:
             
             # Verify calculations
             expected_total_excluding = position.planned_salary_rate + position.increase_amount
-            if abs(calculated['total_excluding_contribution'] - expected_total_excluding) > 0.01:
+            if abs(calculated[0] - expected_total_excluding) > 0.01:  # total_excluding_contribution
                 validation_issues.append(f"[!] {position.position_function}: Calculation mismatch in total excluding contribution")
             
             position_summary.append({
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Regression test for the patenting Excel filler
+Checks that the XML-patching fast path writes the same cells as the openpyxl path
+"""
+
+import os
+import sys
+import tempfile
+
+import openpyxl
+
+# Add the patenting agent directory to the Python path
+PATENTING_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "agents", "ENGISH_1B_priedas_InoStartas_en", "Patenting"
+)
+sys.path.insert(0, PATENTING_DIR)
+
+from patenting import PatentData, PatentExcelFiller, PatentServiceEntry
+
+TEMPLATE_PATH = os.path.join(PATENTING_DIR, "patenting.xlsx")
+
+
+def _entry(supplier_info, price_eur):
+    return PatentServiceEntry("Service", supplier_info, price_eur, "test")
+
+
+def _read_cells(path, sheet_name):
+    """Return {coordinate: value} for every cell of the given sheet"""
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook[sheet_name]
+    return {cell.coordinate: cell.value for row in sheet.iter_rows() for cell in row}
+
+
+def test_fast_fill_matches_openpyxl_fill():
+    """None, empty, fractional and bool values must read back the same from both paths"""
+    print("🧪 Comparing fast and openpyxl Excel fills")
+
+    patent_data = PatentData(
+        phase1_attorney_services=[_entry(None, 0.1), _entry("", True), _entry("Tab\there & <co>", 1234.5678)],
+        phase1_taxes=[_entry("Fee schedule", 1 / 3), _entry("Zero fee", 0.0)],
+        phase2_attorney_services=[_entry("Attorney", 0.1 + 0.2)],
+        phase2_taxes=[_entry(None, False), _entry("", 2.5e-7), _entry("Large", 123456789.125), _entry("Int", 7)]
+    )
+
+    filler = PatentExcelFiller()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        openpyxl_path = os.path.join(temp_dir, "openpyxl.xlsx")
+        fast_path = os.path.join(temp_dir, "fast.xlsx")
+
+        assert filler.fill_excel_form(TEMPLATE_PATH, openpyxl_path, patent_data)
+        assert filler.fill_excel_form_fast(TEMPLATE_PATH, fast_path, patent_data)
+
+        sheet_name = filler._load_template(TEMPLATE_PATH).sheet_name
+        expected = _read_cells(openpyxl_path, sheet_name)
+        actual = _read_cells(fast_path, sheet_name)
+
+    differences = {
+        coordinate: (expected.get(coordinate), actual.get(coordinate))
+        for coordinate in expected.keys() | actual.keys()
+        if expected.get(coordinate) != actual.get(coordinate)
+        or type(expected.get(coordinate)) is not type(actual.get(coordinate))
+    }
+    assert not differences, f"Cells differ (openpyxl, fast): {differences}"
+    print(f"✅ {len(expected)} cells match")
+
+
+def test_fast_fill_escapes_control_characters():
+    """openpyxl rejects control characters; the fast path stores them with the OOXML _xHHHH_ escape"""
+    print("🧪 Checking control characters in supplier info")
+
+    patent_data = PatentData([_entry("A\x01B\x1fC", 10.0)], [], [], [])
+
+    filler = PatentExcelFiller()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        openpyxl_path = os.path.join(temp_dir, "openpyxl.xlsx")
+        fast_path = os.path.join(temp_dir, "fast.xlsx")
+
+        assert not filler.fill_excel_form(TEMPLATE_PATH, openpyxl_path, patent_data)
+        assert filler.fill_excel_form_fast(TEMPLATE_PATH, fast_path, patent_data)
+
+        cells = _read_cells(fast_path, filler._load_template(TEMPLATE_PATH).sheet_name)
+
+    assert cells["B7"] == "A_x0001_B_x001F_C", cells["B7"]
+    assert cells["D7"] == 10.0, cells["D7"]
+    print("✅ Control characters escaped")
+
+
+if __name__ == "__main__":
+    test_fast_fill_matches_openpyxl_fill()
+    test_fast_fill_escapes_control_characters()